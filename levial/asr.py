@@ -1,6 +1,46 @@
+import http.client
+import io
+import json
+import math
 import os
+import socket
 import subprocess
+import threading
+import time
+import uuid
+import wave
 from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+PcmInput = Union[np.ndarray, memoryview, bytes]
+
+
+def pcm_to_int16(audio: PcmInput) -> np.ndarray:
+    """Return mono int16 samples for an int16/float32 array, memoryview or raw int16 bytes."""
+    if isinstance(audio, memoryview):
+        dtype = np.float32 if audio.format == "f" else np.int16
+        audio = np.frombuffer(audio, dtype=dtype)
+    elif isinstance(audio, (bytes, bytearray)):
+        audio = np.frombuffer(audio, dtype=np.int16)
+    audio = audio.reshape(-1)
+    if audio.dtype == np.int16:
+        return audio
+    # Assume float (-1.0 to 1.0)
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def pcm_to_wav_bytes(audio: PcmInput, sample_rate: int) -> bytes:
+    """Wrap PCM samples in an in-memory WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm_to_int16(audio).tobytes())
+    return buffer.getvalue()
+
 
 class WhisperASR:
     def __init__(self, bin_path: Path, model_path: Path, base_dir: Path):
@@ -14,15 +54,28 @@ class WhisperASR:
             base_dir / "whisper.cpp" / "build" / "ggml" / "src" / "ggml-metal",
         ]
 
-    def transcribe(self, audio_path: Path) -> str:
-        """Invoke Whisper CLI and return the transcript string."""
+    def start(self) -> bool:
+        """whisper-cli needs no warm-up; subclasses keep a model resident."""
+        return True
+
+    def warm(self) -> bool:
+        """Run a dummy decode so the first real one is fast. Nothing is resident for whisper-cli."""
+        return False
+
+    def stop(self) -> None:
+        pass
+
+    def _env(self) -> dict:
         env = os.environ.copy()
         dyld_paths = [str(p) for p in self.dyld_parts if p.exists()]
         existing = env.get("DYLD_LIBRARY_PATH")
         if existing:
             dyld_paths.append(existing)
         env["DYLD_LIBRARY_PATH"] = ":".join(dyld_paths)
+        return env
 
+    def transcribe(self, audio_path: Path) -> str:
+        """Invoke Whisper CLI and return the transcript string."""
         cmd = [
             str(self.bin_path),
             "-m",
@@ -33,8 +86,579 @@ class WhisperASR:
         ]
 
         print("[…] Running Whisper transcription...")
-        subprocess.run(cmd, check=True, cwd=str(self.base_dir), env=env)
+        subprocess.run(cmd, check=True, cwd=str(self.base_dir), env=self._env())
         txt_path = Path(f"{audio_path}.txt")  # whisper-cli appends ".txt" to original filename
         transcript = txt_path.read_text(encoding="utf-8").strip()
         print(f"[Whisper] {transcript}")
         return transcript
+
+    def transcribe_pcm(self, audio: PcmInput, sample_rate: int = 16000) -> str:
+        """
+        Transcribe an in-memory buffer without touching the disk.
+
+        The audio is piped to whisper-cli as WAV on stdin ("-f -") and the
+        transcript is read back from stdout.
+        """
+        cmd = [
+            str(self.bin_path),
+            "-m",
+            str(self.model_path),
+            "-f",
+            "-",
+            "-nt",  # no timestamps
+            "-np",  # only print the transcript
+        ]
+
+        print("[…] Running Whisper transcription...")
+        result = subprocess.run(
+            cmd,
+            input=pcm_to_wav_bytes(audio, sample_rate),
+            capture_output=True,
+            check=True,
+            cwd=str(self.base_dir),
+            env=self._env(),
+        )
+        transcript = " ".join(result.stdout.decode("utf-8", errors="ignore").split())
+        print(f"[Whisper] {transcript}")
+        return transcript
+
+
+class WhisperServerASR(WhisperASR):
+    def __init__(self,
+                 server_bin_path: Path,
+                 bin_path: Path,
+                 model_path: Path,
+                 base_dir: Path,
+                 host: str = "127.0.0.1",
+                 port: int = 8910,
+                 startup_timeout: float = 60.0):
+        """
+        WhisperASR backed by a long-lived whisper.cpp server process.
+
+        The model is loaded once when the worker starts; each utterance is then a
+        request over a local socket instead of a new whisper-cli process. Falls
+        back to whisper-cli if the server is not running.
+
+        Args:
+            server_bin_path: Path to whisper.cpp's whisper-server binary.
+            bin_path: Path to whisper-cli, used as a fallback.
+            model_path: GGML model to load.
+            base_dir: Project base directory.
+            host: Interface the server binds to (keep it local).
+            port: Port the server listens on.
+            startup_timeout: How long to wait for the model to load.
+        """
+        super().__init__(bin_path, model_path, base_dir)
+        self.server_bin_path = server_bin_path
+        self.host = host
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()
+        # start() may be called from several warm-up threads (cascade + command recognizer)
+        self._start_lock = threading.Lock()
+        self.requests = 0
+        self.total_decode_sec = 0.0
+        self.last_decode_sec: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> bool:
+        """Launch the server and block until the model is loaded. Returns False on failure."""
+        with self._start_lock:
+            return self._start()
+
+    def _start(self) -> bool:
+        if self.ready:
+            return True
+        if not self.server_bin_path.exists():
+            print(f"[!] whisper-server not found at {self.server_bin_path}; using whisper-cli.")
+            return False
+
+        cmd = [
+            str(self.server_bin_path),
+            "-m",
+            str(self.model_path),
+            "--host",
+            self.host,
+            "--port",
+            str(self.port),
+        ]
+        print(f"[…] Starting Whisper server ({self.model_path.name})...")
+        started = time.time()
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=str(self.base_dir),
+            env=self._env(),
+        )
+
+        # The server only starts listening once the model is loaded
+        while time.time() - started < self.startup_timeout:
+            if self.process.poll() is not None:
+                print(f"[x] Whisper server exited with code {self.process.returncode}; using whisper-cli.")
+                self.process = None
+                return False
+            try:
+                with socket.create_connection((self.host, self.port), timeout=0.5):
+                    print(f"[✓] Whisper server ready in {time.time() - started:.1f}s")
+                    return True
+            except OSError:
+                time.sleep(0.1)
+
+        print("[x] Whisper server did not come up in time; using whisper-cli.")
+        self.stop()
+        return False
+
+    def stop(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+            self.process = None
+
+    def warm(self) -> bool:
+        """Decode half a second of silence; the server allocates its compute buffers on the first request."""
+        if not self.ready:
+            return False
+        started = time.time()
+        try:
+            self._inference(pcm_to_wav_bytes(np.zeros(8000, dtype=np.int16), 16000))
+        except (http.client.HTTPException, OSError, RuntimeError, ValueError) as exc:
+            print(f"[!] Whisper warm-up failed ({self.model_path.name}): {exc}")
+            return False
+        print(f"[✓] Whisper {self.model_path.name} warm in {time.time() - started:.1f}s")
+        return True
+
+    def _inference(self, wav_bytes: bytes, response_format: str = "json", prompt: Optional[str] = None) -> dict:
+        boundary = uuid.uuid4().hex
+        fields = {"response_format": response_format, "temperature": "0.0"}
+        if prompt:
+            fields["prompt"] = prompt
+        body = io.BytesIO()
+        for name, value in fields.items():
+            body.write(f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode())
+        body.write(f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"audio.wav\"\r\n"
+                   "Content-Type: audio/wav\r\n\r\n".encode())
+        body.write(wav_bytes)
+        body.write(f"\r\n--{boundary}--\r\n".encode())
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+        with self._lock:
+            # Reuse one keep-alive connection; reconnect once if the server dropped it
+            for attempt in range(2):
+                if self._connection is None:
+                    self._connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+                try:
+                    self._connection.request("POST", "/inference", body=body.getvalue(), headers=headers)
+                    response = self._connection.getresponse()
+                    payload = response.read()
+                    break
+                except (http.client.HTTPException, OSError):
+                    self._connection.close()
+                    self._connection = None
+                    if attempt:
+                        raise
+        if response.status != 200:
+            raise RuntimeError(f"Whisper server error {response.status}: {payload[:200]!r}")
+        return json.loads(payload)
+
+    def _transcribe_wav(self, wav_bytes: bytes, prompt: Optional[str] = None) -> str:
+        started = time.time()
+        result = self._inference(wav_bytes, prompt=prompt)
+        self.last_decode_sec = time.time() - started
+        self.requests += 1
+        self.total_decode_sec += self.last_decode_sec
+
+        transcript = " ".join(result.get("text", "").split())
+        print(f"[Whisper] {transcript} ({self.last_decode_sec * 1000:.0f} ms)")
+        return transcript
+
+    def transcribe_pcm(self, audio: PcmInput, sample_rate: int = 16000) -> str:
+        if not self.ready:
+            return super().transcribe_pcm(audio, sample_rate)
+        return self._transcribe_wav(pcm_to_wav_bytes(audio, sample_rate))
+
+    def transcribe(self, audio_path: Path) -> str:
+        if not self.ready:
+            return super().transcribe(audio_path)
+        return self._transcribe_wav(Path(audio_path).read_bytes())
+
+
+class CommandRecognizer:
+    STOP = "stop"
+    EXIT = "exit"
+    CONTINUE = "continue"
+
+    PHRASES = {
+        STOP: ("thank you", "thanks", "stop", "okay stop", "that's enough", "enough", "be quiet", "never mind"),
+        EXIT: ("goodbye", "good bye", "bye", "bye bye"),
+    }
+
+    def __init__(self,
+                 fallback: WhisperASR,
+                 fast: Optional[WhisperServerASR] = None,
+                 max_command_words: int = 4):
+        """
+        Classifies barge-in audio into stop / exit / continue.
+
+        Interruptions are usually one of a handful of short phrases, so they are
+        first decoded by a small model kept warm in its own whisper-server, with
+        the command vocabulary as the decoding prompt. Only if that does not yield
+        a known command is the audio decoded again by the full ASR, whose text is
+        returned so the interruption can be handled as a new request.
+
+        Args:
+            fallback: Full ASR used when the phrase is not a known command.
+            fast: Warm small-model server for the command pass (skipped if None or not running).
+            max_command_words: Longest transcript treated as a command; anything longer is a new request.
+        """
+        self.fallback = fallback
+        self.fast = fast
+        self.max_command_words = max_command_words
+        self.prompt = ", ".join(phrase.capitalize() for phrases in self.PHRASES.values() for phrase in phrases) + "."
+        self.fast_hits = 0
+        self.fallbacks = 0
+
+    def start(self) -> bool:
+        if self.fast is None:
+            return False
+        if not self.fast.model_path.exists():
+            print(f"[!] Command model not found at {self.fast.model_path}; barge-in uses the full ASR.")
+            self.fast = None
+            return False
+        return self.fast.start()
+
+    def stop(self) -> None:
+        if self.fast is not None:
+            self.fast.stop()
+
+    def warm(self) -> bool:
+        return self.fast is not None and self.fast.warm()
+
+    def match(self, text: str, max_words: Optional[int] = None) -> Optional[str]:
+        """Return STOP/EXIT if `text` contains a command phrase (and is at most `max_words` long)."""
+        words = "".join(c if c.isalnum() or c == "'" else " " for c in text.lower()).split()
+        if not words or (max_words is not None and len(words) > max_words):
+            return None
+        padded = f" {' '.join(words)} "
+        # Exit wins over stop: "thank you, goodbye" ends the session
+        for command in (self.EXIT, self.STOP):
+            if any(f" {phrase} " in padded for phrase in self.PHRASES[command]):
+                return command
+        return None
+
+    def classify(self, audio: PcmInput, sample_rate: int = 16000) -> tuple[str, str]:
+        """Return (command, transcript) for an interruption."""
+        if self.fast is not None and self.fast.ready:
+            try:
+                text = self.fast._transcribe_wav(pcm_to_wav_bytes(audio, sample_rate), prompt=self.prompt)
+            except (http.client.HTTPException, OSError, RuntimeError, ValueError) as exc:
+                # Fall through to the full ASR
+                text = ""
+                print(f"[!] Command model decode failed: {exc}")
+            command = self.match(text, self.max_command_words)
+            if command:
+                self.fast_hits += 1
+                print(f"[Command] {command} ({self.fast.last_decode_sec * 1000:.0f} ms)")
+                return command, text
+
+        self.fallbacks += 1
+        text = self.fallback.transcribe_pcm(audio, sample_rate)
+        return self.match(text, self.max_command_words) or self.CONTINUE, text
+
+
+class CascadeASR:
+    def __init__(self,
+                 fast: WhisperServerASR,
+                 accurate: WhisperASR,
+                 logprob_threshold: float = -0.7,
+                 no_speech_threshold: float = 0.6):
+        """
+        Two-tier transcription: a small model first, the large one only when needed.
+
+        Every utterance is decoded by the fast model with per-segment confidence
+        (verbose_json). If the duration-weighted average token log-probability
+        is below `logprob_threshold`, or the model thinks there is probably no
+        speech but still produced text, the audio is decoded again by the accurate
+        model. Drop-in replacement for WhisperASR; if the fast server is not
+        running, every request goes to the accurate model.
+
+        Args:
+            fast: Small model in a warm whisper-server (e.g. ggml-tiny.en).
+            accurate: The profile's model.
+            logprob_threshold: Average log-probability below which the fast result is rejected.
+            no_speech_threshold: No-speech probability above which the fast result is rejected.
+        """
+        self.fast = fast
+        self.accurate = accurate
+        self.logprob_threshold = logprob_threshold
+        self.no_speech_threshold = no_speech_threshold
+        self.requests = 0
+        self.escalations = 0
+        self.fast_sec = 0.0
+        self.accurate_sec = 0.0
+        self.audio_sec = 0.0
+        self.escalated_audio_sec = 0.0
+        self.accepted_audio_sec = 0.0
+        self.last_confidence: Optional[dict] = None
+
+    @property
+    def model_path(self) -> Path:
+        return self.accurate.model_path
+
+    def start(self) -> bool:
+        # The larger model first: the command recognizer may already be starting the shared small one
+        ready = self.accurate.start()
+        if not self.fast.model_path.exists():
+            print(f"[!] Fast ASR model not found at {self.fast.model_path}; cascade disabled.")
+        else:
+            self.fast.start()
+        return ready
+
+    def stop(self) -> None:
+        self.fast.stop()
+        self.accurate.stop()
+
+    def warm(self) -> bool:
+        # Bypasses transcribe_pcm so the dummy decode doesn't count in the cascade stats
+        self.fast.warm()
+        return self.accurate.warm()
+
+    @staticmethod
+    def confidence(result: dict) -> dict:
+        """Duration-weighted avg_logprob and max no_speech_prob over a verbose_json result."""
+        total = weighted = 0.0
+        no_speech = 0.0
+        for segment in result.get("segments", []):
+            duration = max(float(segment.get("end", 0)) - float(segment.get("start", 0)), 1e-3)
+            logprob = segment.get("avg_logprob")
+            if logprob is None:
+                # Older servers only report word probabilities
+                probs = [w.get("probability", 0.0) for w in segment.get("words", [])]
+                logprob = sum(math.log(max(p, 1e-6)) for p in probs) / len(probs) if probs else None
+            if logprob is not None:
+                weighted += logprob * duration
+                total += duration
+            no_speech = max(no_speech, float(segment.get("no_speech_prob", 0.0)))
+        return {
+            "avg_logprob": weighted / total if total else None,
+            "no_speech_prob": no_speech,
+        }
+
+    def _should_escalate(self, text: str, confidence: dict) -> bool:
+        if not text:
+            # Nothing decoded is the least confident result, unless the model is sure it was silence
+            return confidence["no_speech_prob"] <= self.no_speech_threshold
+        if confidence["avg_logprob"] is None:
+            return True
+        if confidence["no_speech_prob"] > self.no_speech_threshold:
+            return True
+        return confidence["avg_logprob"] < self.logprob_threshold
+
+    def transcribe_pcm(self, audio: PcmInput, sample_rate: int = 16000) -> str:
+        if not self.fast.ready:
+            return self.accurate.transcribe_pcm(audio, sample_rate)
+
+        audio_sec = len(pcm_to_int16(audio)) / sample_rate
+        wav_bytes = pcm_to_wav_bytes(audio, sample_rate)
+        started = time.time()
+        try:
+            result = self.fast._inference(wav_bytes, response_format="verbose_json")
+        except (http.client.HTTPException, OSError, RuntimeError, ValueError) as exc:
+            result = self.last_confidence = None
+            print(f"[!] Fast Whisper decode failed ({exc}); using {self.accurate.model_path.name}")
+        fast_sec = time.time() - started
+
+        self.requests += 1
+        self.audio_sec += audio_sec
+        self.fast_sec += fast_sec
+        if result is not None:
+            text = " ".join(result.get("text", "").split())
+            confidence = self.last_confidence = self.confidence(result)
+            logprob = confidence["avg_logprob"]
+            logprob_str = "n/a" if logprob is None else f"{logprob:.2f}"
+            if not self._should_escalate(text, confidence):
+                self.accepted_audio_sec += audio_sec
+                print(f"[Whisper] {text} (fast, {fast_sec * 1000:.0f} ms, logprob {logprob_str})")
+                return text
+            print(f"[…] Low confidence (logprob {logprob_str}, no-speech {confidence['no_speech_prob']:.2f}); re-decoding with {self.accurate.model_path.name}")
+
+        self.escalations += 1
+        self.escalated_audio_sec += audio_sec
+        started = time.time()
+        text = self.accurate.transcribe_pcm(audio, sample_rate)
+        self.accurate_sec += time.time() - started
+        return text
+
+    def transcribe(self, audio_path: Path) -> str:
+        with wave.open(str(audio_path), "rb") as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            sample_rate = wf.getframerate()
+        return self.transcribe_pcm(audio, sample_rate)
+
+    def stats(self) -> dict:
+        """
+        Escalation rate and estimated latency saved.
+
+        The time the accurate model would have spent on accepted utterances is
+        estimated from its measured speed on escalated ones.
+        """
+        saved = None
+        if self.escalated_audio_sec > 0:
+            accurate_rtf = self.accurate_sec / self.escalated_audio_sec
+            # Fast decodes of escalated utterances are pure overhead
+            saved = self.accepted_audio_sec * accurate_rtf - self.fast_sec
+        return {
+            "requests": self.requests,
+            "escalations": self.escalations,
+            "escalation_rate": self.escalations / self.requests if self.requests else 0.0,
+            "fast_sec": self.fast_sec,
+            "accurate_sec": self.accurate_sec,
+            "latency_saved_sec": saved,
+        }
+
+
+class StreamingTranscriber:
+    def __init__(self,
+                 asr: WhisperASR,
+                 sample_rate: int = 16000,
+                 interval_sec: float = 1.0,
+                 window_sec: float = 8.0,
+                 min_audio_sec: float = 1.0,
+                 on_partial: Optional[Callable[[str], None]] = None,
+                 partial_asr: Optional[WhisperServerASR] = None):
+        """
+        Incremental transcription of an utterance that is still being recorded.
+
+        While the user speaks, the uncommitted tail of the growing recorder buffer is
+        re-decoded every `interval_sec` and reported through `on_partial`. Once the
+        tail exceeds `window_sec`, the part up to its quietest point is committed so
+        its text is final. At the endpoint only the remaining tail still needs
+        decoding, instead of the whole utterance.
+
+        Partial tail decodes are display-only and go to `partial_asr` (the small
+        model) when it is running; committed parts and the final tail go to `asr`.
+        Utterances shorter than `window_sec` never commit anything, so finish()
+        decodes them whole with `asr`, exactly once.
+
+        Args:
+            asr: Backend for final text (ideally a warm WhisperServerASR or a CascadeASR).
+            sample_rate: Sample rate of the recording.
+            interval_sec: How often to re-decode during recording.
+            window_sec: Longest tail re-decoded before part of it is committed.
+            min_audio_sec: Minimum uncommitted audio before a partial decode.
+            on_partial: Receives the running transcript after each decode.
+            partial_asr: Warm server for the re-decoded tail, e.g. the cascade's small
+                model, so partials don't count as (or escalate like) final decodes.
+        """
+        self.asr = asr
+        self.partial_asr = partial_asr
+        self.sample_rate = sample_rate
+        self.interval_sec = interval_sec
+        self.window_sec = window_sec
+        self.min_audio_sec = min_audio_sec
+        self.on_partial = on_partial
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.committed_samples = 0
+        self.committed_text: list[str] = []
+        self.tail_text = ""
+        self.tail_end = 0
+
+    def start(self, recorder) -> None:
+        """Begin decoding `recorder` (a levial.audio.PcmRecorder) in the background."""
+        self._reset()
+        self.running = True
+        self.thread = threading.Thread(target=self._decode_loop, args=(recorder,), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _quietest_cut(self, audio: np.ndarray, start: int, end: int) -> int:
+        """Index of the lowest-energy 20 ms frame between `start` and `end`."""
+        frame = max(1, int(0.02 * self.sample_rate))
+        segment = audio[start:end - (end - start) % frame].astype(np.float32)
+        if len(segment) < frame:
+            return end
+        energy = (segment.reshape(-1, frame) ** 2).mean(axis=1)
+        return start + int(np.argmin(energy)) * frame + frame // 2
+
+    def _decode_step(self, audio: np.ndarray) -> None:
+        window = int(self.window_sec * self.sample_rate)
+        tail = audio[self.committed_samples:]
+        if len(tail) > window:
+            # Commit audio up to a pause so the window stays bounded
+            cut = self._quietest_cut(tail, window // 2, int(window * 0.9))
+            text = self.asr.transcribe_pcm(tail[:cut], self.sample_rate)
+            if text:
+                self.committed_text.append(text)
+            self.committed_samples += cut
+            tail = audio[self.committed_samples:]
+
+        self.tail_text = self._partial_backend().transcribe_pcm(tail, self.sample_rate) if len(tail) else ""
+        self.tail_end = len(audio)
+
+    def _partial_backend(self) -> WhisperASR:
+        if self.partial_asr is not None and self.partial_asr.ready:
+            return self.partial_asr
+        return self.asr
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.committed_text + ([self.tail_text] if self.tail_text else []))
+
+    def _decode_loop(self, recorder) -> None:
+        min_samples = int(self.min_audio_sec * self.sample_rate)
+        next_decode = time.time() + self.interval_sec
+        while self.running:
+            time.sleep(max(0.0, min(0.05, next_decode - time.time())))
+            if time.time() < next_decode:
+                continue
+            next_decode = time.time() + self.interval_sec
+            audio = recorder.view()
+            if len(audio) - self.committed_samples < min_samples or len(audio) == self.tail_end:
+                continue
+            try:
+                self._decode_step(audio)
+            except Exception as e:
+                print(f"[!] Partial transcription failed: {e}")
+                continue
+            if self.on_partial and self.text:
+                self.on_partial(self.text)
+
+    def finish(self, audio: np.ndarray, offset: int = 0) -> str:
+        """
+        Stop partial decoding and return the final transcript of `audio`.
+
+        Args:
+            audio: The recorded utterance, possibly trimmed.
+            offset: Samples trimmed off the front of the recorder buffer; committed
+                positions are shifted by it (a commit inside the trimmed part keeps
+                its text and the tail starts at the beginning of `audio`).
+        """
+        self.stop()
+        end = offset + len(audio)
+        # A partial tail (small model) is never final text
+        if self.tail_end != end or offset or self._partial_backend() is not self.asr:
+            tail = audio[max(0, self.committed_samples - offset):]
+            self.tail_text = self.asr.transcribe_pcm(tail, self.sample_rate) if len(tail) else ""
+            self.tail_end = end
+        return self.text
@@ -3,22 +3,88 @@ import sys
 import threading
 import time
 import wave
-import shutil
-import subprocess
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
-import sounddevice as sd
+
+from .audio_bus import MicrophoneBus
+
+
+def block_rms(block: np.ndarray) -> float:
+    """RMS of an audio block on a -1.0..1.0 scale, for int16 or float input."""
+    samples = block.astype(np.float32)
+    if block.dtype == np.int16:
+        samples /= 32768.0
+    return float(np.sqrt(np.mean(samples ** 2))) if samples.size else 0.0
+
+class PcmRecorder:
+    def __init__(self, sample_rate: int, max_duration_sec: Optional[float] = None, initial_sec: float = 5.0):
+        """
+        Growable int16 buffer that recorded blocks are converted into in place.
+
+        The buffer is preallocated for `max_duration_sec` when it is known (otherwise
+        `initial_sec`) and doubles when full, so a recording never goes through a
+        list of chunks and a final concatenate/clip/convert pass.
+        """
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_duration_sec * sample_rate) if max_duration_sec else None
+        capacity = self.max_samples or int(initial_sec * sample_rate)
+        self._buffer = np.empty(capacity, dtype=np.int16)
+        self._scratch = np.empty(0, dtype=np.float32)
+        self.length = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def duration(self) -> float:
+        return self.length / self.sample_rate
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self._buffer))
+        grown = np.empty(capacity, dtype=np.int16)
+        grown[:self.length] = self._buffer[:self.length]
+        self._buffer = grown
+
+    def append(self, block: np.ndarray) -> None:
+        """Append an int16 or float (-1.0 to 1.0) block, converting straight into the buffer."""
+        samples = block.reshape(-1)
+        end = self.length + len(samples)
+        if end > len(self._buffer):
+            self._grow(end)
+        dest = self._buffer[self.length:end]
+
+        if samples.dtype == np.int16:
+            dest[...] = samples
+        else:
+            if len(self._scratch) < len(samples):
+                self._scratch = np.empty(len(samples), dtype=np.float32)
+            scratch = self._scratch[:len(samples)]
+            np.clip(samples, -1.0, 1.0, out=scratch)
+            np.multiply(scratch, 32767, out=dest, casting="unsafe")
+        self.length = end
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of the captured samples."""
+        return self._buffer[:self.length]
+
+    def clear(self) -> None:
+        self.length = 0
+
 
 class AudioCapture:
-    def __init__(self, sample_rate: int, channels: int, max_duration_sec: Optional[float] = None):
+    def __init__(self, sample_rate: int, channels: int, max_duration_sec: Optional[float] = None, bus: Optional[MicrophoneBus] = None):
         self.sample_rate = sample_rate
         self.channels = channels
         self.max_duration_sec = max_duration_sec
+        # Recordings read from the shared microphone bus; a private one is created
+        # (and opened per recording) when running standalone.
+        self.bus = bus
 
-    def record_until_enter(self, output_path: Path) -> Optional[Path]:
-        """Record audio until the user presses Enter. Returns path to the wav file."""
+    def record_until_enter(self, output_path: Optional[Path] = None) -> Optional[np.ndarray]:
+        """Record audio until the user presses Enter. Returns the int16 samples."""
         print("Recording... Press Enter to stop.")
         stop_event = threading.Event()
 
@@ -29,43 +95,56 @@ class AudioCapture:
         threading.Thread(target=wait_for_stop, daemon=True).start()
         return self._record_loop(output_path, stop_event)
 
-    def record_until_silence(self, output_path: Path, silence_threshold: float = 0.01, silence_duration: float = 2.0, volume_callback=None) -> Optional[Path]:
-        """Record audio until silence is detected for a duration."""
+    def record_until_silence(self, output_path: Optional[Path] = None, silence_threshold: float = 0.01, silence_duration: float = 2.0, volume_callback=None, start_position: Optional[int] = None, endpointer=None, recorder: Optional[PcmRecorder] = None) -> Optional[np.ndarray]:
+        """
+        Record audio until silence is detected for a duration. Returns the int16 samples.
+
+        `start_position` is a microphone bus sequence number to start from, so speech
+        that began right after the wake word is included. If an `endpointer`
+        (levial.endpointing.Endpointer) is given it decides when speech has ended
+        instead of the fixed RMS threshold. If `output_path` is given, the recording
+        is also written there in the background. Passing a `recorder` lets other
+        stages (e.g. streaming ASR) read the utterance while it is being captured.
+        """
         print("Recording... Speak now.")
         stop_event = threading.Event()
         
-        return self._record_loop(output_path, stop_event, silence_threshold, silence_duration, volume_callback)
+        return self._record_loop(output_path, stop_event, silence_threshold, silence_duration, volume_callback, start_position, endpointer, recorder)
 
-    def _record_loop(self, output_path: Path, stop_event: threading.Event, silence_threshold: float = 0, silence_duration: float = 0, volume_callback=None) -> Optional[Path]:
-        audio_queue: queue.Queue[np.ndarray] = queue.Queue()
-        frames: list[np.ndarray] = []
+    def _record_loop(self, output_path: Optional[Path], stop_event: threading.Event, silence_threshold: float = 0, silence_duration: float = 0, volume_callback=None, start_position: Optional[int] = None, endpointer=None, recorder: Optional[PcmRecorder] = None) -> Optional[np.ndarray]:
+        bus = self.bus
+        owns_bus = bus is None
+        if owns_bus:
+            bus = MicrophoneBus(sample_rate=self.sample_rate)
+            bus.start()
 
-        def callback(indata, frames_count, time_info, status):
-            if status:
-                print(f"[audio] {status}", file=sys.stderr)
-            audio_queue.put(indata.copy())
+        subscription = bus.subscribe(start_position)
+        recorder = recorder or PcmRecorder(bus.sample_rate, self.max_duration_sec)
 
-        start_time = time.time()
         last_sound_time = time.time()
         is_speaking = False
+        if endpointer is not None:
+            endpointer.reset()
 
-        with sd.InputStream(
-            samplerate=self.sample_rate,
-            channels=self.channels,
-            dtype="float32",
-            callback=callback,
-        ):
+        try:
             while not stop_event.is_set():
-                try:
-                    chunk = audio_queue.get(timeout=0.1)
-                    frames.append(chunk)
+                chunk = subscription.read(timeout=0.1)
+                if chunk is not None:
+                    recorder.append(chunk)
+
+                    if endpointer is not None:
+                        if volume_callback:
+                            volume_callback(block_rms(chunk))
+                        if endpointer.process(chunk):
+                            print(f"[i] Endpoint detected ({endpointer.reason}).")
+                            stop_event.set()
                     
                     # Silence Detection Logic
-                    if silence_duration > 0 or volume_callback:
-                        rms = np.sqrt(np.mean(chunk**2))
+                    elif silence_duration > 0 or volume_callback:
+                        rms = block_rms(chunk)
                         
                         if volume_callback:
-                            volume_callback(float(rms))
+                            volume_callback(rms)
 
                         if rms > silence_threshold:
                             last_sound_time = time.time()
@@ -74,97 +153,220 @@ class AudioCapture:
                         if is_speaking and (time.time() - last_sound_time > silence_duration):
                             print("[i] Silence detected.")
                             stop_event.set()
-                            
-                except queue.Empty:
-                    continue
                     
-                if self.max_duration_sec and (time.time() - start_time) >= self.max_duration_sec:
+                elif subscription.exhausted:
+                    print("[i] Audio source finished.")
+                    stop_event.set()
+                    
+                # Measured in audio time so file sources can run faster than real time
+                if self.max_duration_sec and recorder.duration >= self.max_duration_sec:
                     print(f"[i] Recording limit reached ({self.max_duration_sec}s).")
                     stop_event.set()
+        finally:
+            subscription.close()
+            if owns_bus:
+                bus.stop()
 
-        if not frames:
+        if recorder.length == 0:
             print("[!] No audio captured.")
             return None
+        if endpointer is not None and not endpointer.speech_detected:
+            print("[!] No speech detected.")
+            return None
 
-        audio = np.concatenate(frames, axis=0)
-        audio = np.clip(audio, -1.0, 1.0)
-        audio_int16 = (audio * 32767).astype(np.int16)
+        audio = recorder.view()
+        if output_path is not None:
+            self.save_audio_async(audio, output_path, sample_rate=bus.sample_rate, channels=bus.channels)
+        return audio
 
-        with wave.open(str(output_path), "wb") as wf:
-            wf.setnchannels(self.channels)
-            wf.setsampwidth(2)
-            wf.setframerate(self.sample_rate)
-            wf.writeframes(audio_int16.tobytes())
-
-        print(f"[✓] Saved recording to {output_path}")
-        return output_path
-    def save_audio(self, frames: list[np.ndarray], output_path: Path) -> Optional[Path]:
-        """Save raw audio frames to a WAV file."""
-        if not frames:
+    def save_audio(self, frames: list[np.ndarray] | np.ndarray, output_path: Path, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Optional[Path]:
+        """Save raw audio frames (or one contiguous array) to a WAV file."""
+        if len(frames) == 0:
             print("[!] No audio to save.")
             return None
 
-        audio = np.concatenate(frames, axis=0)
-        
-        # Handle different data types
-        if audio.dtype == np.int16:
-            audio_int16 = audio
+        if isinstance(frames, np.ndarray) and frames.dtype == np.int16:
+            audio_int16 = np.ascontiguousarray(frames)
         else:
-            # Assume float32/float64 (-1.0 to 1.0)
-            audio = np.clip(audio, -1.0, 1.0)
-            audio_int16 = (audio * 32767).astype(np.int16)
+            recorder = PcmRecorder(sample_rate or self.sample_rate, initial_sec=0)
+            for frame in ([frames] if isinstance(frames, np.ndarray) else frames):
+                recorder.append(frame)
+            audio_int16 = recorder.view()
 
         with wave.open(str(output_path), "wb") as wf:
-            wf.setnchannels(self.channels)
+            wf.setnchannels(channels or self.channels)
             wf.setsampwidth(2)
-            wf.setframerate(self.sample_rate)
-            wf.writeframes(audio_int16.tobytes())
+            wf.setframerate(sample_rate or self.sample_rate)
+            wf.writeframes(audio_int16)
 
         print(f"[✓] Saved recording to {output_path}")
         return output_path
 
+    def save_audio_async(self, frames: list[np.ndarray] | np.ndarray, output_path: Path, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> threading.Thread:
+        """Write a recording to disk in a background thread, off the turn's critical path."""
+        thread = threading.Thread(
+            target=self.save_audio,
+            args=(frames, output_path, sample_rate, channels),
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
 class AudioPlayer:
-    def __init__(self):
-        self.current_process: Optional[subprocess.Popen] = None
+    def __init__(self, block_size: int = 512, device: Optional[int] = None):
+        """
+        In-process streaming playback on a sounddevice OutputStream.
 
-    def play(self, audio_path: Path) -> None:
-        """Play audio using afplay (macOS) or fallback to stdout path. Non-blocking."""
-        self.stop() # Stop any previous playback
-        
-        cmd = []
-        if shutil.which("afplay"):
-            cmd = ["afplay", str(audio_path)]
-        elif shutil.which("ffplay"):
-            cmd = ["ffplay", "-nodisp", "-autoexit", str(audio_path)]
-        else:
-            print(f"[i] Audio ready at {audio_path}; open it manually.")
+        PCM chunks are queued with enqueue() and the audio callback starts on the
+        first one straight away. The stream stays open between replies, and stop()
+        takes effect on the next callback, i.e. within one block.
+
+        Args:
+            block_size: Frames per callback; bounds the barge-in cut latency.
+            device: Optional sounddevice output device index.
+        """
+        self.block_size = block_size
+        self.device = device
+        self.stream = None
+        self.sample_rate: Optional[int] = None
+        self.channels = 1
+        self._queue: queue.Queue[np.ndarray] = queue.Queue()
+        self._chunk: Optional[np.ndarray] = None
+        self._chunk_offset = 0
+        self._input_done = True
+        self._stop_requested = False
+        self._done = threading.Event()
+        self._done.set()
+        self._lock = threading.Lock()
+        self.frames_played = 0
+        self.frames_queued = 0
+
+    @property
+    def is_playing(self) -> bool:
+        return not self._done.is_set()
+
+    @property
+    def position_sec(self) -> float:
+        """Seconds of the current stream that have been played."""
+        return self.frames_played / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def queued_sec(self) -> float:
+        """Seconds of audio handed to the player for the current stream."""
+        return self.frames_queued / self.sample_rate if self.sample_rate else 0.0
+
+    def _open(self, sample_rate: int, channels: int) -> None:
+        if self.stream is not None and self.sample_rate == sample_rate and self.channels == channels:
+            return
+        self._close_stream()
+        import sounddevice as sd
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.stream = sd.OutputStream(
+            samplerate=sample_rate,
+            channels=channels,
+            dtype="int16",
+            blocksize=self.block_size,
+            device=self.device,
+            callback=self._callback,
+        )
+        self.stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status:
+            print(f"[audio] {status}", file=sys.stderr)
+        out = outdata.reshape(-1)
+        with self._lock:
+            if self._stop_requested:
+                out[:] = 0
+                return
+
+            written = 0
+            while written < len(out):
+                if self._chunk is None or self._chunk_offset >= len(self._chunk):
+                    try:
+                        self._chunk = self._queue.get_nowait()
+                        self._chunk_offset = 0
+                    except queue.Empty:
+                        self._chunk = None
+                        break
+                n = min(len(out) - written, len(self._chunk) - self._chunk_offset)
+                out[written:written + n] = self._chunk[self._chunk_offset:self._chunk_offset + n]
+                self._chunk_offset += n
+                written += n
+
+            out[written:] = 0
+            self.frames_played += written // self.channels
+            if written == 0 and self._input_done:
+                self._done.set()
+
+    def begin(self, sample_rate: int, channels: int = 1) -> None:
+        """Start a new stream of chunks, cutting off anything still playing."""
+        self.stop()
+        with self._lock:
+            self._stop_requested = False
+            self._input_done = False
+            self.frames_played = 0
+            self.frames_queued = 0
+            self._done.clear()
+        try:
+            self._open(sample_rate, channels)
+        except Exception as e:
+            print(f"[x] Audio playback failed: {e}")
+            self._done.set()
+
+    def enqueue(self, pcm: np.ndarray) -> None:
+        """Queue int16 (or float -1.0..1.0) samples for playback."""
+        if self._done.is_set():
             return
+        if pcm.dtype != np.int16:
+            pcm = (np.clip(pcm, -1.0, 1.0) * 32767).astype(np.int16)
+        pcm = pcm.reshape(-1)
+        self.frames_queued += len(pcm) // self.channels
+        self._queue.put(pcm)
+
+    def end(self) -> None:
+        """Mark the stream complete; playback finishes once the queue drains."""
+        self._input_done = True
 
+    def play(self, audio_path: Path) -> None:
+        """Play a WAV file. Non-blocking."""
         try:
-            # Use Popen to allow interruption
-            self.current_process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
-            )
-            # We don't wait here, so we can interrupt. 
-            # But we might want to know when it finishes? 
-            # For now, the orchestrator will handle flow.
+            with wave.open(str(audio_path), "rb") as wf:
+                sample_rate = wf.getframerate()
+                channels = wf.getnchannels()
+                pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
         except Exception as e:
             print(f"[x] Audio playback failed: {e}")
+            return
+        self.begin(sample_rate, channels)
+        self.enqueue(pcm)
+        self.end()
 
     def stop(self):
-        """Stop current playback immediately."""
-        if self.current_process:
-            if self.current_process.poll() is None:
-                self.current_process.terminate()
+        """Stop current playback immediately (within one block)."""
+        with self._lock:
+            self._stop_requested = True
+            self._input_done = True
+            while True:
                 try:
-                    self.current_process.wait(timeout=0.1)
-                except subprocess.TimeoutExpired:
-                    self.current_process.kill()
-            self.current_process = None
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._chunk = None
+            self._done.set()
 
-    def wait(self):
+    def wait(self, timeout: Optional[float] = None) -> bool:
         """Wait for playback to finish."""
-        if self.current_process:
-            self.current_process.wait()
+        return self._done.wait(timeout)
+
+    def _close_stream(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def close(self):
+        """Release the output device."""
+        self.stop()
+        self._close_stream()
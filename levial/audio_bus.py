@@ -0,0 +1,230 @@
+import threading
+from typing import Optional, Set
+
+import numpy as np
+
+from .audio_sources import AudioSource, MicrophoneSource
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity_blocks: int, block_size: int, dtype=np.int16):
+        """
+        Fixed-size ring of equally sized mono audio blocks.
+
+        Blocks are addressed by a monotonically increasing sequence number, so
+        readers can keep their own cursor and replay anything still in the ring.
+        """
+        self.capacity = capacity_blocks
+        self.block_size = block_size
+        self._blocks = np.zeros((capacity_blocks, block_size), dtype=dtype)
+        self._write_seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def write_seq(self) -> int:
+        """Sequence number the next block will be written to."""
+        return self._write_seq
+
+    @property
+    def oldest_seq(self) -> int:
+        """Oldest sequence number still held in the ring."""
+        return max(0, self._write_seq - self.capacity)
+
+    def write(self, block: np.ndarray) -> None:
+        """Copy a block into the next slot and wake up waiting readers."""
+        samples = block.reshape(-1)
+        n = min(len(samples), self.block_size)
+        with self._cond:
+            slot = self._blocks[self._write_seq % self.capacity]
+            slot[:n] = samples[:n]
+            slot[n:] = 0
+            self._write_seq += 1
+            self._cond.notify_all()
+
+    def read(self, seq: int, timeout: Optional[float] = None) -> tuple[Optional[np.ndarray], int]:
+        """
+        Read the block at `seq`, waiting up to `timeout` seconds for it to arrive.
+
+        Returns the block (a copy) and the next sequence number to read. If the
+        reader fell behind the ring, it is moved forward to the oldest block.
+        """
+        with self._cond:
+            if seq < self.oldest_seq:
+                seq = self.oldest_seq
+            if seq >= self._write_seq:
+                self._cond.wait_for(lambda: seq < self._write_seq, timeout=timeout)
+                if seq >= self._write_seq:
+                    return None, seq
+            block = self._blocks[seq % self.capacity].copy()
+            # Let a backpressured writer know a slot may have been freed
+            self._cond.notify_all()
+            return block, seq + 1
+
+    def wait(self, predicate, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(predicate, timeout=timeout)
+
+    def wake_all(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+
+class BusSubscription:
+    def __init__(self, bus: "MicrophoneBus", position: int):
+        """
+        A reader cursor on the microphone bus.
+
+        Instances are callable with the `audio_stream_callback(n)` signature used by
+        WakeWordListener and SpeechDetector, so they can be handed over directly.
+        """
+        self.bus = bus
+        self.position = position
+        self.dropped_blocks = 0
+        self.closed = False
+
+    def read(self, timeout: Optional[float] = 0.1) -> Optional[np.ndarray]:
+        """Return the next block, or None if nothing arrived within `timeout`."""
+        if self.closed:
+            return None
+        requested = self.position
+        block, self.position = self.bus.ring.read(requested, timeout=timeout)
+        if block is not None and self.position - 1 > requested:
+            self.dropped_blocks += self.position - 1 - requested
+        return block
+
+    def seek(self, position: int) -> None:
+        self.position = position
+
+    @property
+    def exhausted(self) -> bool:
+        """True once a finite source has ended and every block has been read."""
+        return self.bus.finished.is_set() and self.position >= self.bus.position
+
+    def close(self) -> None:
+        self.closed = True
+        self.bus._unsubscribe(self)
+
+    def __call__(self, n: Optional[int] = None) -> Optional[np.ndarray]:
+        return self.read()
+
+
+class MicrophoneBus:
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 block_size: int = 1280,
+                 buffer_sec: float = 10.0,
+                 device: Optional[int] = None,
+                 source: Optional[AudioSource] = None):
+        """
+        Long-lived audio capture shared by every pipeline stage.
+
+        One int16 mono source (the microphone by default) feeds a preallocated ring
+        buffer; the wake word listener, recorder, level meter and VAD each read it
+        through their own subscription, so switching states never reopens the
+        device or loses audio.
+
+        Non-realtime sources (files, generated signals) are backpressured: they
+        only advance while someone is subscribed and only once the slowest reader
+        has consumed every block written so far, so the pipeline runs as fast as
+        it can consume audio and a reader subscribing at the live edge never
+        skips audio that nobody has read.
+
+        Args:
+            sample_rate: Capture rate. openWakeWord expects 16 kHz.
+            block_size: Samples per block. openWakeWord works on 1280 (80 ms).
+            buffer_sec: How much history the ring keeps for late or rewinding readers.
+            device: Optional sounddevice input device index for the default source.
+            source: Audio source to use instead of the live microphone.
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.channels = 1
+        self.source = source or MicrophoneSource(sample_rate, block_size, device=device)
+        capacity = max(1, int(buffer_sec * sample_rate / block_size))
+        self.ring = AudioRingBuffer(capacity, block_size)
+        self.running = False
+        self.finished = threading.Event()
+        self._subscribers: Set[BusSubscription] = set()
+        # Where the last reader stopped; new readers of a non-realtime source resume here
+        self._last_closed_position: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def block_duration(self) -> float:
+        return self.block_size / self.sample_rate
+
+    @property
+    def position(self) -> int:
+        """Sequence number of the next block to be captured."""
+        return self.ring.write_seq
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.finished.clear()
+        self.source.start(self._on_block, self._on_end)
+        print(f"[✓] Audio bus started ({type(self.source).__name__}, {self.sample_rate} Hz, {self.block_size}-sample blocks)")
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        self.ring.wake_all()
+        self.source.stop()
+        self.ring.wake_all()
+
+    def _readers_keep_up(self) -> bool:
+        # At most one block of lead over the slowest reader
+        with self._lock:
+            if not self._subscribers:
+                return False
+            slowest = min(sub.position for sub in self._subscribers)
+        return slowest >= self.ring.write_seq
+
+    def _on_block(self, block: np.ndarray) -> None:
+        if not self.source.realtime:
+            while self.running and not self.ring.wait(self._readers_keep_up, timeout=0.1):
+                pass
+            if not self.running:
+                return
+        self.ring.write(block)
+
+    def _on_end(self) -> None:
+        self.finished.set()
+        self.ring.wake_all()
+
+    def subscribe(self, position: Optional[int] = None) -> BusSubscription:
+        """
+        Create a reader starting at `position` (default: the live edge).
+
+        Passing an earlier position replays audio still held in the ring, which is
+        how the recorder picks up speech that immediately followed the wake word.
+        For non-realtime sources the default is the slowest live reader (or where
+        the last reader stopped), so the block written ahead of it isn't skipped.
+        """
+        with self._lock:
+            if position is None:
+                position = self.position
+                if not self.source.realtime:
+                    if self._subscribers:
+                        position = min(position, min(sub.position for sub in self._subscribers))
+                    elif self._last_closed_position is not None:
+                        position = min(position, self._last_closed_position)
+                    position = max(position, self.ring.oldest_seq)
+            subscription = BusSubscription(self, position)
+            self._subscribers.add(subscription)
+        self.ring.wake_all()
+        return subscription
+
+    def _unsubscribe(self, subscription: BusSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                self._last_closed_position = subscription.position
+        self.ring.wake_all()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
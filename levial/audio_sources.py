@@ -0,0 +1,231 @@
+import os
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+BlockCallback = Callable[[np.ndarray], None]
+
+
+class AudioSource:
+    """
+    Producer of int16 mono blocks for the microphone bus.
+
+    `realtime` sources deliver audio at wall-clock speed and drop nothing on
+    their own (live mic); non-realtime sources run as fast as their consumers
+    read, which the bus enforces with backpressure.
+    """
+    realtime = True
+
+    def __init__(self, sample_rate: int = 16000, block_size: int = 1280):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+
+    def start(self, on_block: BlockCallback, on_end: Callable[[], None]) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+class MicrophoneSource(AudioSource):
+    def __init__(self, sample_rate: int = 16000, block_size: int = 1280, device: Optional[int] = None):
+        super().__init__(sample_rate, block_size)
+        self.device = device
+        self.stream = None
+
+    def start(self, on_block: BlockCallback, on_end: Callable[[], None]) -> None:
+        # Imported here so file/synthetic sources work on machines without PortAudio
+        import sounddevice as sd
+
+        def callback(indata, frames, time_info, status):
+            if status:
+                print(f"[audio] {status}", file=sys.stderr)
+            on_block(indata)
+
+        self.stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="int16",
+            blocksize=self.block_size,
+            device=self.device,
+            callback=callback,
+        )
+        self.stream.start()
+
+    def stop(self) -> None:
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class GeneratedSource(AudioSource):
+    def __init__(self, sample_rate: int = 16000, block_size: int = 1280, realtime: bool = False, loop: bool = False):
+        """
+        Finite source driven by its own thread.
+
+        Args:
+            realtime: Pace blocks at wall-clock speed instead of as fast as possible.
+            loop: Start over when the audio runs out.
+        """
+        super().__init__(sample_rate, block_size)
+        self.realtime = realtime
+        self.loop = loop
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def samples(self) -> np.ndarray:
+        """The full int16 signal this source plays."""
+        raise NotImplementedError
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples()) / self.sample_rate
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        """Iterate the signal in blocks (last block zero-padded), without a bus or thread."""
+        while True:
+            audio = self.samples()
+            for start in range(0, len(audio), self.block_size):
+                block = audio[start:start + self.block_size]
+                if len(block) < self.block_size:
+                    block = np.concatenate([block, np.zeros(self.block_size - len(block), dtype=np.int16)])
+                yield block
+            if not self.loop:
+                return
+
+    def start(self, on_block: BlockCallback, on_end: Callable[[], None]) -> None:
+        self.running = True
+        self.thread = threading.Thread(target=self._run, args=(on_block, on_end), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+
+    def _run(self, on_block: BlockCallback, on_end: Callable[[], None]) -> None:
+        block_duration = self.block_size / self.sample_rate
+        next_time = time.monotonic()
+        for block in self.blocks():
+            if not self.running:
+                break
+            if self.realtime:
+                next_time += block_duration
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            on_block(block)
+        on_end()
+
+
+def _to_int16(audio: np.ndarray) -> np.ndarray:
+    if audio.dtype == np.int16:
+        return audio
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+class WavFileSource(GeneratedSource):
+    def __init__(self, path: Path, sample_rate: int = 16000, block_size: int = 1280, realtime: bool = False, loop: bool = False):
+        """Plays a 16-bit WAV file, downmixed to mono and resampled to `sample_rate`."""
+        super().__init__(sample_rate, block_size, realtime, loop)
+        self.path = Path(path)
+        self._samples: Optional[np.ndarray] = None
+
+    def samples(self) -> np.ndarray:
+        if self._samples is None:
+            with wave.open(str(self.path), "rb") as wf:
+                if wf.getsampwidth() != 2:
+                    raise ValueError(f"{self.path}: only 16-bit PCM WAV is supported")
+                audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+                channels = wf.getnchannels()
+                rate = wf.getframerate()
+            if channels > 1:
+                audio = audio.reshape(-1, channels).mean(axis=1).astype(np.int16)
+            if rate != self.sample_rate:
+                n_out = int(len(audio) * self.sample_rate / rate)
+                positions = np.linspace(0, len(audio) - 1, n_out)
+                audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.int16)
+            self._samples = audio
+        return self._samples
+
+
+class SignalSource(GeneratedSource):
+    def __init__(self,
+                 kind: str = "silence",
+                 duration_sec: float = 1.0,
+                 frequency: float = 440.0,
+                 amplitude: float = 0.1,
+                 sample_rate: int = 16000,
+                 block_size: int = 1280,
+                 realtime: bool = False,
+                 loop: bool = False,
+                 seed: int = 0):
+        """Generated test signal: "silence", "tone" (sine) or "noise" (white)."""
+        super().__init__(sample_rate, block_size, realtime, loop)
+        if kind not in ("silence", "tone", "noise"):
+            raise ValueError(f"Unknown signal kind: {kind}")
+        self.kind = kind
+        n = int(duration_sec * sample_rate)
+        if kind == "tone":
+            t = np.arange(n) / sample_rate
+            signal = amplitude * np.sin(2 * np.pi * frequency * t)
+        elif kind == "noise":
+            signal = np.random.default_rng(seed).uniform(-amplitude, amplitude, n)
+        else:
+            signal = np.zeros(n)
+        self._samples = _to_int16(signal)
+
+    def samples(self) -> np.ndarray:
+        return self._samples
+
+
+class SequenceSource(GeneratedSource):
+    def __init__(self, parts: List[GeneratedSource], sample_rate: int = 16000, block_size: int = 1280, realtime: bool = False, loop: bool = False):
+        """Plays several generated sources back to back, e.g. silence + wake word + command."""
+        super().__init__(sample_rate, block_size, realtime, loop)
+        self.parts = parts
+        self._samples: Optional[np.ndarray] = None
+
+    def samples(self) -> np.ndarray:
+        if self._samples is None:
+            self._samples = np.concatenate([part.samples() for part in self.parts])
+        return self._samples
+
+    @property
+    def offsets_sec(self) -> List[float]:
+        """Start time of each part within the sequence."""
+        offsets, t = [], 0.0
+        for part in self.parts:
+            offsets.append(t)
+            t += part.duration_sec
+        return offsets
+
+
+def create_audio_source(config: Dict[str, Any], sample_rate: int = 16000, block_size: int = 1280) -> AudioSource:
+    """
+    Build an audio source from the `audio_source` config section.
+
+    {"type": "microphone", "device": null}
+    {"type": "file", "path": "...", "realtime": false, "loop": false}
+    {"type": "signal", "kind": "noise", "duration_sec": 10, "realtime": false}
+
+    The LVCA_AUDIO_FILE environment variable overrides the config with a file source.
+    """
+    config = dict(config)
+    if os.environ.get("LVCA_AUDIO_FILE"):
+        config = {"type": "file", "path": os.environ["LVCA_AUDIO_FILE"]}
+
+    source_type = config.pop("type", "microphone")
+    if source_type == "microphone":
+        return MicrophoneSource(sample_rate, block_size, device=config.get("device"))
+    if source_type == "file":
+        return WavFileSource(config.pop("path"), sample_rate, block_size, **config)
+    if source_type == "signal":
+        return SignalSource(sample_rate=sample_rate, block_size=block_size, **config)
+    raise ValueError(f"Unknown audio source type: {source_type}")
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+# (name, fn, args) of a queued task
+_Task = Tuple[str, Callable[..., Any], tuple]
+
+
+class BackgroundTaskQueue:
+    HIGH = 0
+    LOW = 1
+
+    def __init__(self, max_concurrency: int = 2, max_pending: int = 100):
+        """
+        Post-turn work (memory writes, knowledge extraction) run off the critical path.
+
+        Tasks are plain callables executed in worker threads by `max_concurrency`
+        asyncio workers. HIGH tasks run as soon as a worker is free. LOW tasks
+        (extra LLM calls) are only started while no foreground request is in
+        flight; wrap that request in `async with queue.foreground():`. Held LOW
+        tasks stay in the queue, so they never occupy a worker that a HIGH task
+        could use. A LOW task that is already running is not pre-empted: it
+        keeps going and can still overlap the next turn's LLM request.
+
+        Args:
+            max_concurrency: Tasks running at the same time.
+            max_pending: Queued tasks beyond which new submissions are dropped.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._queues: Tuple[Deque[_Task], Deque[_Task]] = (deque(), deque())
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._done: Optional[asyncio.Event] = None
+        self._foreground = 0
+        self._unfinished = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._done = asyncio.Event()
+        if self._unfinished == 0:
+            self._done.set()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    def submit(self, fn: Callable[..., Any], *args, name: str = "", priority: int = HIGH) -> bool:
+        """Queue `fn(*args)`. Returns False if the queue is full or not started."""
+        if self._wakeup is None or self.pending >= self.max_pending:
+            self.dropped += 1
+            print(f"[!] Background queue full; dropped {name or fn.__name__}")
+            return False
+        self._queues[priority].append((name or fn.__name__, fn, args))
+        self._unfinished += 1
+        self._done.clear()
+        self._wakeup.set()
+        self.submitted += 1
+        return True
+
+    @asynccontextmanager
+    async def foreground(self):
+        """Mark a latency-critical section; LOW tasks are not started while it runs."""
+        self._foreground += 1
+        try:
+            yield
+        finally:
+            self._foreground -= 1
+            if self._foreground == 0 and self._wakeup is not None:
+                self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    def _next(self) -> Optional[_Task]:
+        high, low = self._queues
+        if high:
+            return high.popleft()
+        if low and self._foreground == 0:
+            return low.popleft()
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            task = self._next()
+            if task is None:
+                # Woken by submit() and by the end of a foreground section
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            name, fn, args = task
+            try:
+                started = time.time()
+                await asyncio.to_thread(fn, *args)
+                self.completed += 1
+                print(f"[i] Background {name} done in {time.time() - started:.1f}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"[!] Background {name} failed: {e}")
+            finally:
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._done.set()
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued tasks to finish. Returns False on timeout."""
+        if self._done is None:
+            return True
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def clear(self) -> int:
+        """Drop the tasks that haven't started yet. Returns how many were dropped."""
+        dropped = self.pending
+        for queue in self._queues:
+            queue.clear()
+        self._unfinished -= dropped
+        self.dropped += dropped
+        if self._unfinished == 0 and self._done is not None:
+            self._done.set()
+        return dropped
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
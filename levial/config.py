@@ -38,14 +38,61 @@ class ConfigManager:
     def whisper_bin_path(self) -> Path:
         return self.base_dir / "whisper.cpp" / "build" / "bin" / "whisper-cli"
 
+    @property
+    def whisper_server_bin_path(self) -> Path:
+        return self.base_dir / "whisper.cpp" / "build" / "bin" / "whisper-server"
+
+    @property
+    def asr(self) -> Dict[str, Any]:
+        """ASR backend settings: {"mode": "server" | "cli", "port": ...}."""
+        return self.config.get("asr", {"mode": "server"})
+
     @property
     def piper_model_path(self) -> Path:
         return Path(os.environ.get("PIPER_MODEL", self.base_dir / self.profile.get("piper_model", "en_US-lessac-medium.onnx")))
 
+    @property
+    def tts(self) -> Dict[str, Any]:
+        """TTS backend settings: {"backend": "python" | "cli"}."""
+        return self.config.get("tts", {"backend": "python"})
+
+    @property
+    def tts_cache(self) -> Dict[str, Any]:
+        """Synthesized audio cache and filler phrases (levial.tts_cache)."""
+        return self.config.get("tts_cache", {"enabled": True})
+
+    @property
+    def response_cache(self) -> Dict[str, Any]:
+        """Semantic cache of final replies (levial.response_cache)."""
+        return self.config.get("response_cache", {"enabled": True})
+
+    @property
+    def knowledge(self) -> Dict[str, Any]:
+        """Batched knowledge extraction: {"batch_turns": 5, "idle_sec": 120, "shutdown_drain_sec": 3}."""
+        return self.config.get("knowledge", {"batch_turns": 5, "idle_sec": 120, "shutdown_drain_sec": 3})
+
     @property
     def llm_model_name(self) -> str:
         return os.environ.get("OLLAMA_MODEL", self.profile.get("llm_model", "mistral:latest"))
 
+    @property
+    def llm(self) -> Dict[str, Any]:
+        """Ollama client settings: {"keep_alive": "30m"}. The host comes from OLLAMA_HOST."""
+        return self.config.get("llm", {})
+
+    @property
+    def llm_small_model(self) -> str | None:
+        """Smaller Ollama model for cheap request classes (see llm.routing); None disables routing."""
+        return os.environ.get("OLLAMA_SMALL_MODEL", self.profile.get("llm_small_model"))
+
+    @property
+    def llm_options(self) -> Dict[str, Any]:
+        """Ollama sampling options from the profile: `temperature` plus any `llm_options`."""
+        options = dict(self.profile.get("llm_options", {}))
+        if "temperature" in self.profile:
+            options["temperature"] = self.profile["temperature"]
+        return options
+
     @property
     def mic_sample_rate(self) -> int:
         return self.profile.get("mic_sample_rate", 16_000)
@@ -57,11 +104,44 @@ class ConfigManager:
     @property
     def max_history_turns(self) -> int:
         return self.profile.get("max_history_turns", 6)
+
+    @property
+    def history_token_budget(self) -> int:
+        return self.profile.get("history_token_budget", 1500)
+
+    @property
+    def max_tool_output_tokens(self) -> int:
+        return self.profile.get("max_tool_output_tokens", 300)
     
     @property
     def recording_max_sec(self) -> float | None:
         return self.config.get("timeouts", {}).get("recording_max_sec")
 
+    @property
+    def endpointing(self) -> Dict[str, Any]:
+        """Keyword arguments for levial.endpointing.Endpointer."""
+        return self.config.get("endpointing", {})
+
+    @property
+    def preprocess(self) -> Dict[str, Any]:
+        """Utterance preprocessing before ASR: {"trim_silence": true, "pad_sec": 0.25}."""
+        return self.config.get("preprocess", {"trim_silence": True})
+
+    @property
+    def audio_level(self) -> Dict[str, Any]:
+        """Keyword arguments for levial.level_meter.LevelMeter."""
+        return self.config.get("audio_level", {})
+
+    @property
+    def audio_source(self) -> Dict[str, Any]:
+        """Where audio comes from; see levial.audio_sources.create_audio_source."""
+        return self.config.get("audio_source", {"type": "microphone"})
+
+    @property
+    def persist_audio(self) -> bool:
+        """Whether recordings are also written to artifacts_dir (in the background)."""
+        return self.config.get("persist_audio", False)
+
     @property
     def config_data(self) -> Dict[str, Any]:
         return self.config
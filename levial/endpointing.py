@@ -0,0 +1,139 @@
+import logging
+import math
+from typing import Optional
+
+import numpy as np
+
+from .audio import block_rms
+
+logger = logging.getLogger(__name__)
+
+
+class Endpointer:
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 vad_threshold: float = 0.5,
+                 hangover_sec: float = 0.4,
+                 min_speech_sec: float = 0.15,
+                 snr_margin_db: float = 6.0,
+                 max_silence_sec: float = 1.5,
+                 no_speech_timeout_sec: Optional[float] = 5.0,
+                 initial_noise_floor_db: float = -60.0,
+                 use_vad: bool = True):
+        """
+        End-of-speech detection for a streamed utterance.
+
+        A block counts as speech when the openWakeWord VAD (the same model used by
+        SpeechDetector) is above `vad_threshold` AND its energy clears an adaptive
+        noise floor by `snr_margin_db`. The floor follows non-speech blocks (quickly
+        down, slowly up), so a noisy room raises the bar instead of holding the
+        recording open. End of speech is declared after `hangover_sec` of non-speech.
+
+        Args:
+            sample_rate: Sample rate of the incoming blocks.
+            vad_threshold: VAD score above which a block may be speech.
+            hangover_sec: Non-speech needed after speech to declare the endpoint.
+            min_speech_sec: Speech needed before an endpoint can be declared.
+            snr_margin_db: How far above the noise floor speech must be.
+            max_silence_sec: Hangover used when the VAD model is unavailable.
+            no_speech_timeout_sec: Give up if no speech starts within this time.
+            initial_noise_floor_db: Starting noise floor estimate (dBFS).
+            use_vad: Load the openWakeWord VAD. Energy-only if False or unavailable.
+        """
+        self.sample_rate = sample_rate
+        self.vad_threshold = vad_threshold
+        self.hangover_sec = hangover_sec
+        self.min_speech_sec = min_speech_sec
+        self.snr_margin_db = snr_margin_db
+        self.max_silence_sec = max_silence_sec
+        self.no_speech_timeout_sec = no_speech_timeout_sec
+        self.initial_noise_floor_db = initial_noise_floor_db
+        # Noise floor smoothing per block: fast when it drops, slow when it rises
+        self.floor_attack = 0.5
+        self.floor_release = 0.05
+
+        self.vad = None
+        if use_vad:
+            try:
+                from openwakeword.vad import VAD
+                self.vad = VAD()
+            except Exception as e:
+                logger.warning(f"openWakeWord VAD unavailable, using energy-only endpointing: {e}")
+
+        self.noise_floor_db = initial_noise_floor_db
+        self.reset()
+
+    def reset(self):
+        """Prepare for a new utterance. The noise floor carries over between utterances."""
+        if self.vad is not None and hasattr(self.vad, "reset_states"):
+            self.vad.reset_states()
+        self.elapsed_sec = 0.0
+        self.speech_sec = 0.0
+        self.silence_run_sec = 0.0
+        self.first_speech_start_sec: Optional[float] = None
+        self.last_speech_end_sec: Optional[float] = None
+        self.endpoint_sec: Optional[float] = None
+        self.reason: Optional[str] = None
+
+    @property
+    def speech_detected(self) -> bool:
+        return self.speech_sec >= self.min_speech_sec
+
+    @property
+    def speech_bounds_sec(self) -> Optional[tuple[float, float]]:
+        """(start, end) of the speech seen since reset, relative to the first block."""
+        if not self.speech_detected:
+            return None
+        return self.first_speech_start_sec, self.last_speech_end_sec
+
+    @property
+    def endpoint_latency_sec(self) -> Optional[float]:
+        """Time between the end of the last speech block and the endpoint."""
+        if self.endpoint_sec is None or self.last_speech_end_sec is None:
+            return None
+        return self.endpoint_sec - self.last_speech_end_sec
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        """Classify one block and update the noise floor."""
+        energy_db = 20 * math.log10(max(block_rms(block), 1e-10))
+        loud = energy_db > self.noise_floor_db + self.snr_margin_db
+
+        if self.vad is not None:
+            score = self.vad(block)
+            speech = loud and score is not None and score >= self.vad_threshold
+        else:
+            # Without a VAD, require a clearer margin above the floor
+            speech = energy_db > self.noise_floor_db + 2 * self.snr_margin_db
+
+        if not speech:
+            alpha = self.floor_attack if energy_db < self.noise_floor_db else self.floor_release
+            self.noise_floor_db += alpha * (energy_db - self.noise_floor_db)
+        return speech
+
+    def process(self, block: np.ndarray) -> bool:
+        """Feed the next block. Returns True once the utterance has ended."""
+        if self.endpoint_sec is not None:
+            return True
+
+        duration = len(block.reshape(-1)) / self.sample_rate
+        self.elapsed_sec += duration
+
+        if self.is_speech(block):
+            self.speech_sec += duration
+            self.silence_run_sec = 0.0
+            if self.first_speech_start_sec is None:
+                self.first_speech_start_sec = self.elapsed_sec - duration
+            self.last_speech_end_sec = self.elapsed_sec
+        else:
+            self.silence_run_sec += duration
+
+        hangover = self.hangover_sec if self.vad is not None else self.max_silence_sec
+        if self.speech_detected and self.silence_run_sec >= hangover:
+            self.reason = "end_of_speech"
+        elif not self.speech_detected and self.no_speech_timeout_sec and self.elapsed_sec >= self.no_speech_timeout_sec:
+            self.reason = "no_speech"
+
+        if self.reason:
+            self.endpoint_sec = self.elapsed_sec
+            return True
+        return False
@@ -0,0 +1,163 @@
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+Entry = Tuple[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English with Llama/Mistral tokenizers)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class HistoryManager:
+    def __init__(self,
+                 max_turns: int = 6,
+                 token_budget: int = 1500,
+                 max_tool_output_tokens: int = 300,
+                 summarize_fn: Optional[Callable[[str], str]] = None,
+                 summary_tokens: int = 150,
+                 schedule: Optional[Callable[[Callable[[], None]], Any]] = None):
+        """
+        Conversation history kept within a token budget.
+
+        Entries are (role, content) pairs with a cached token estimate. Replies
+        are stored once as "assistant" ("agent" is treated as an alias and exact
+        repeats are dropped). Tool outputs are kept whole while their turn is in
+        the history, so the LLM always reads the full result. When the history
+        exceeds `max_turns` user turns or `token_budget` tokens, the oldest whole
+        turns are evicted and folded into a running summary by `summarize_fn` in the
+        background, so the request that triggered the eviction never waits
+        for it. The current turn is never evicted. The summary is rendered as
+        the first history entry.
+
+        Args:
+            max_turns: User turns kept verbatim.
+            token_budget: Tokens the verbatim history (plus summary) may use.
+            max_tool_output_tokens: Tool outputs of evicted turns are cut to this
+                many tokens in the summarization prompt.
+            summarize_fn: LLM call used for the summary (prompt -> text). Evicted
+                turns are simply dropped if None.
+            summary_tokens: Target length of the summary.
+            schedule: Runs the summarization job (e.g. on a BackgroundTaskQueue);
+                a daemon thread is used if None.
+        """
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.max_tool_output_tokens = max_tool_output_tokens
+        self.summarize_fn = summarize_fn
+        self.summary_tokens = summary_tokens
+        self.schedule = schedule
+        self.summary = ""
+        self._entries: List[Tuple[str, str, int]] = []
+        self._evicted: List[Entry] = []
+        self._lock = threading.Lock()
+        self._summarizing = False
+        self.evicted_turns = 0
+
+    @property
+    def tokens(self) -> int:
+        with self._lock:
+            return self._tokens_locked()
+
+    def _tokens_locked(self) -> int:
+        summary = estimate_tokens(self.summary) if self.summary else 0
+        return summary + sum(tokens for _, _, tokens in self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, role: str, content: str) -> None:
+        if role == "agent":
+            role = "assistant"
+        with self._lock:
+            if self._entries and self._entries[-1][:2] == (role, content):
+                return
+            self._entries.append((role, content, estimate_tokens(content)))
+            evicted = self._enforce_budget()
+        if evicted:
+            self._schedule_summary()
+
+    def _shrink(self, role: str, content: str, tokens: int) -> str:
+        # Only the gist of an old tool output matters for the summary
+        if role == "system" and tokens > self.max_tool_output_tokens:
+            return content[:self.max_tool_output_tokens * 4] + " …[truncated]"
+        return content
+
+    def _turn_starts(self) -> List[int]:
+        return [i for i, (role, _, _) in enumerate(self._entries) if role == "user"]
+
+    def _enforce_budget(self) -> bool:
+        evicted = False
+        while True:
+            starts = self._turn_starts()
+            # Never evict the current (last) turn
+            if len(starts) < 2:
+                break
+            if len(starts) <= self.max_turns and self._tokens_locked() <= self.token_budget:
+                break
+            end = starts[1]
+            self._evicted.extend(
+                (role, self._shrink(role, content, tokens)) for role, content, tokens in self._entries[:end]
+            )
+            del self._entries[:end]
+            self.evicted_turns += 1
+            evicted = True
+        return evicted
+
+    def _schedule_summary(self) -> None:
+        if self.summarize_fn is None:
+            with self._lock:
+                self._evicted.clear()
+            return
+        with self._lock:
+            if self._summarizing:
+                # The running job picks up these turns before it finishes
+                return
+            self._summarizing = True
+        if self.schedule is not None:
+            if self.schedule(self._summarize) is False:
+                with self._lock:
+                    self._summarizing = False
+        else:
+            threading.Thread(target=self._summarize, daemon=True).start()
+
+    def _summarize(self) -> None:
+        while True:
+            with self._lock:
+                if not self._evicted:
+                    self._summarizing = False
+                    return
+                evicted, self._evicted = self._evicted, []
+                previous = self.summary
+            transcript = "\n".join(f"{role.upper()}: {content}" for role, content in evicted)
+            prompt = (
+                "Update the running summary of a conversation between a user and a voice assistant.\n"
+                f"Keep facts, decisions and open requests; drop small talk. At most {self.summary_tokens * 3 // 4} words.\n\n"
+                f"CURRENT SUMMARY:\n{previous or '(none)'}\n\n"
+                f"NEW TURNS:\n{transcript}\n\n"
+                "UPDATED SUMMARY:"
+            )
+            try:
+                summary = self.summarize_fn(prompt).strip()
+            except Exception as e:
+                print(f"[!] History summarization failed: {e}")
+                with self._lock:
+                    self._summarizing = False
+                return
+            with self._lock:
+                self.summary = summary
+                self._enforce_budget()
+
+    def messages(self) -> List[Entry]:
+        """History as (role, content) pairs, starting with the summary of evicted turns."""
+        with self._lock:
+            entries = [(role, content) for role, content, _ in self._entries]
+            if self.summary:
+                entries.insert(0, ("system", f"Summary of the earlier conversation: {self.summary}"))
+        return entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._evicted.clear()
+            self.summary = ""
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+
+class LevelMeter:
+    def __init__(self,
+                 callback: Callable[[Dict[str, Any]], None],
+                 rate_hz: float = 20.0,
+                 window_sec: float = 0.1,
+                 peak_hold_sec: float = 0.5,
+                 peak_decay_per_sec: float = 1.5,
+                 gain: float = 5.0,
+                 sample_rate: int = 16000):
+        """
+        Aggregated audio level telemetry.
+
+        Blocks are folded into peak/RMS over a sliding `window_sec`, and a reading is
+        published at a fixed `rate_hz` no matter how many blocks arrive, so the UI
+        gets a steady stream instead of one WebSocket event per audio block.
+
+        Args:
+            callback: Receives {"level", "rms", "peak", "peak_hold"} on every tick.
+            rate_hz: Publish rate.
+            window_sec: Window the RMS and peak are computed over.
+            peak_hold_sec: How long a peak is held before it starts to decay.
+            peak_decay_per_sec: Decay speed of the held peak (full scale per second).
+            gain: Scale applied to RMS for the 0..1 "level" shown in the UI.
+            sample_rate: Sample rate of the incoming blocks.
+        """
+        self.callback = callback
+        self.rate_hz = rate_hz
+        self.window_sec = window_sec
+        self.peak_hold_sec = peak_hold_sec
+        self.peak_decay_per_sec = peak_decay_per_sec
+        self.gain = gain
+        self.sample_rate = sample_rate
+
+        # Per block: (sum of squares, sample count, peak)
+        self._window: deque[tuple[float, int, float]] = deque()
+        self._window_samples = 0
+        self._held_peak = 0.0
+        self._held_at = 0.0
+        self._lock = threading.Lock()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.published = 0
+
+    def reset(self):
+        with self._lock:
+            self._window.clear()
+            self._window_samples = 0
+            self._held_peak = 0.0
+            self._held_at = 0.0
+
+    def update(self, block: np.ndarray):
+        """Fold a block (int16 or float) into the current window."""
+        samples = block.reshape(-1).astype(np.float32)
+        if block.dtype == np.int16:
+            samples /= 32768.0
+        if samples.size == 0:
+            return
+        entry = (float(np.dot(samples, samples)), samples.size, float(np.max(np.abs(samples))))
+        max_samples = max(1, int(self.window_sec * self.sample_rate))
+        with self._lock:
+            self._window.append(entry)
+            self._window_samples += entry[1]
+            while len(self._window) > 1 and self._window_samples - self._window[0][1] >= max_samples:
+                self._window_samples -= self._window.popleft()[1]
+
+    def reading(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Current window level with peak-hold applied."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._window_samples:
+                rms = float(np.sqrt(sum(e[0] for e in self._window) / self._window_samples))
+                peak = max(e[2] for e in self._window)
+            else:
+                rms = peak = 0.0
+
+            held = self._held_peak
+            since = now - self._held_at
+            if since > self.peak_hold_sec:
+                held = max(0.0, held - (since - self.peak_hold_sec) * self.peak_decay_per_sec)
+            if peak >= held:
+                self._held_peak, self._held_at, held = peak, now, peak
+
+        return {
+            "level": min(rms * self.gain, 1.0),
+            "rms": rms,
+            "peak": peak,
+            "peak_hold": held,
+        }
+
+    def start(self, subscription):
+        """Consume blocks from a microphone bus subscription and publish at `rate_hz` in a background thread."""
+        self.reset()
+        self.running = True
+        self.thread = threading.Thread(target=self._meter_loop, args=(subscription,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def _meter_loop(self, subscription):
+        interval = 1.0 / self.rate_hz
+        next_tick = time.monotonic() + interval
+        while self.running:
+            # Wait for audio at most until the next tick is due
+            block = subscription.read(timeout=max(0.0, next_tick - time.monotonic()))
+            if block is not None:
+                self.update(block)
+
+            now = time.monotonic()
+            if now >= next_tick:
+                self.callback(self.reading(now))
+                self.published += 1
+                next_tick += interval
+                if next_tick <= now:
+                    # Skip missed ticks rather than bursting to catch up
+                    next_tick = now + interval
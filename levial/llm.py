@@ -1,46 +1,324 @@
-import subprocess
-from typing import List, Tuple
+import asyncio
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class OllamaError(RuntimeError):
+    pass
+
 
 class OllamaLLM:
-    def __init__(self, model_name: str):
+    def __init__(self,
+                 model_name: str,
+                 host: Optional[str] = None,
+                 keep_alive: str = "30m",
+                 options: Optional[Dict[str, Any]] = None,
+                 timeout: float = 300.0,
+                 pool_size: int = 4):
+        """
+        Client for the local Ollama HTTP API.
+
+        Requests go over pooled keep-alive connections instead of spawning
+        `ollama run` per call, `keep_alive` keeps the model loaded between turns,
+        and replies can be consumed token by token (stream / astream).
+
+        Args:
+            model_name: Ollama model tag.
+            host: API base URL. Defaults to $OLLAMA_HOST or http://127.0.0.1:11434,
+                so a local stand-in server can be swapped in.
+            keep_alive: How long Ollama keeps the model in memory after a request.
+            options: Sampling options passed with every request (e.g. temperature).
+            timeout: Socket timeout per request.
+            pool_size: Idle connections kept for reuse.
+        """
         self.model_name = model_name
+        host = host or os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")
+        if "://" not in host:
+            host = f"http://{host}"
+        parsed = urlparse(host)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 11434
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=pool_size)
+        # Counters from the last completed request (prompt_eval_count, eval_count, ...)
+        self.last_stats: Dict[str, Any] = {}
 
-    def build_prompt(self, history: List[Tuple[str, str]], user_text: str, context: str = "", tools_json: str = "", user_preferences: str = "") -> str:
-        system_prompt = (
-            "You are Levial, a capable and intelligent voice assistant. "
-            "You have access to external tools to help the user. "
-            "Use these tools silently and naturally to fulfill requests. "
-            "Do NOT list your tools or explain your capabilities unless explicitly asked. "
-            "Answer conversationally and concisely (1-3 sentences)."
-        )
-        
-        lines = [system_prompt]
-        
-        if user_preferences:
-            lines.append(f"IMPORTANT - ADAPT TO USER PREFERENCES: {user_preferences}")
-        
+    SYSTEM_PROMPT = (
+        "You are Levial, a capable and intelligent voice assistant. "
+        "You have access to external tools to help the user. "
+        "Use these tools silently and naturally to fulfill requests. "
+        "Do NOT list your tools or explain your capabilities unless explicitly asked. "
+        "Answer conversationally and concisely (1-3 sentences)."
+    )
+
+    def _static_sections(self, tools_json: str = "", user_preferences: str = "") -> List[str]:
+        # Identical from turn to turn, so it stays in Ollama's evaluated prefix
+        lines = [self.SYSTEM_PROMPT]
         if tools_json:
             lines.append(f"\nAVAILABLE TOOLS (Use JSON to call):\n{tools_json}\n")
             lines.append("To call a tool, output ONLY a JSON object: {\"tool\": \"tool_name\", \"server\": \"server_name\", \"arguments\": {...}}")
+        if user_preferences:
+            lines.append(f"IMPORTANT - ADAPT TO USER PREFERENCES: {user_preferences}")
+        return lines
+
+    def build_prompt(self, history: List[Tuple[str, str]], user_text: str, context: str = "", tools_json: str = "", user_preferences: str = "") -> str:
+        """Single-string prompt: static sections first, history, then the volatile context and the request."""
+        lines = self._static_sections(tools_json, user_preferences)
 
-        if context:
-            lines.append(f"\nCONTEXT:\n{context}\n")
-            
         for role, content in history:
             lines.append(f"{role.upper()}: {content}")
+
+        if context:
+            lines.append(f"\nCONTEXT:\n{context}\n")
         lines.append(f"USER: {user_text}")
         lines.append("ASSISTANT:")
         return "\n".join(lines)
 
+    def build_messages(self, history: List[Tuple[str, str]], user_text: str, context: str = "", tools_json: str = "", user_preferences: str = "") -> List[Dict[str, str]]:
+        """
+        Chat messages laid out so consecutive prompts share the longest possible prefix.
+
+        The system message holds the instructions, the tool catalog and the
+        preferences. The tool catalog is selected per request, so this prefix is
+        only stable within one request's agentic loop. A new request can change
+        it and lose the cached prefix. Within a loop the history only grows, so
+        Ollama can reuse the KV cache for everything up to the current request.
+        The volatile CONTEXT (clock, retrieved memories) goes right before the
+        current user message. Tool calls and outputs appended to the history
+        during the loop come after it, so later loop turns reuse the whole
+        previous prompt.
+        """
+        messages = [{"role": "system", "content": "\n".join(self._static_sections(tools_json, user_preferences))}]
+        roles = {"user": "user", "assistant": "assistant", "agent": "assistant", "system": "system"}
+
+        # The orchestrator appends the current request to the history before querying
+        current = None
+        for index in range(len(history) - 1, -1, -1):
+            if history[index] == ("user", user_text):
+                current = index
+                break
+
+        for index, (role, content) in enumerate(history):
+            if index == current and context:
+                messages.append({"role": "system", "content": f"CONTEXT:\n{context}"})
+            messages.append({"role": roles.get(role, "user"), "content": content})
+        if current is None:
+            if context:
+                messages.append({"role": "system", "content": f"CONTEXT:\n{context}"})
+            messages.append({"role": "user", "content": user_text})
+        return messages
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _open(self, path: str, payload: Dict[str, Any]) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        # A pooled connection may have been closed by the server; retry once on a fresh one
+        for attempt in range(2):
+            conn = self._acquire() if attempt == 0 else http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                break
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                if attempt:
+                    raise OllamaError(f"Cannot reach Ollama at {self.host}:{self.port}: {exc}") from exc
+        if response.status != 200:
+            detail = response.read()[:500].decode("utf-8", errors="ignore")
+            conn.close()
+            raise OllamaError(f"Ollama error {response.status}: {detail}")
+        return conn, response
+
+    def _payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+        if self.options:
+            payload["options"] = self.options
+        return payload
+
+    def _chat_payload(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+        if self.options:
+            payload["options"] = self.options
+        return payload
+
+    def _record_stats(self, message: Dict[str, Any], started: float) -> None:
+        self.last_stats = {
+            key: message[key]
+            for key in ("prompt_eval_count", "eval_count", "prompt_eval_duration", "eval_duration", "load_duration")
+            if key in message
+        }
+        self.last_stats["wall_sec"] = time.time() - started
+        if "prompt_eval_count" in message:
+            # Only prompt tokens that were not in the KV cache are evaluated
+            prompt_ms = message.get("prompt_eval_duration", 0) / 1e6
+            print(f"[Ollama] prompt eval {message['prompt_eval_count']} tokens ({prompt_ms:.0f} ms), "
+                  f"generated {message.get('eval_count', 0)} tokens")
+
     def query(self, prompt: str) -> str:
         print(f"[…] Querying Ollama ({self.model_name})...")
-        result = subprocess.run(
-            ["ollama", "run", self.model_name],
-            input=prompt,
-            text=True,
-            capture_output=True,
-            check=True,
-        )
-        reply = result.stdout.strip()
+        started = time.time()
+        conn, response = self._open("/api/generate", self._payload(prompt, stream=False))
+        try:
+            message = json.loads(response.read())
+        except (http.client.HTTPException, OSError, ValueError) as exc:
+            conn.close()
+            raise OllamaError(f"Bad response from Ollama: {exc}") from exc
+        self._release(conn)
+        if "error" in message:
+            raise OllamaError(message["error"])
+        self._record_stats(message, started)
+        reply = message.get("response", "").strip()
         print(f"[Ollama] {reply}")
         return reply
+
+    def _stream(self, path: str, payload: Dict[str, Any], extract: Callable[[Dict[str, Any]], str]) -> Iterator[str]:
+        started = time.time()
+        conn, response = self._open(path, payload)
+        finished = False
+        try:
+            while True:
+                try:
+                    line = response.readline()
+                    if not line:
+                        # The server went away before the final chunk; the reply is truncated
+                        raise OllamaError("Ollama stream ended before done")
+                    if not line.strip():
+                        continue
+                    message = json.loads(line)
+                except (http.client.HTTPException, OSError, ValueError) as exc:
+                    raise OllamaError(f"Bad stream from Ollama: {exc}") from exc
+                if "error" in message:
+                    raise OllamaError(message["error"])
+                token = extract(message)
+                if token:
+                    yield token
+                if message.get("done"):
+                    self._record_stats(message, started)
+                    # Drain the terminating chunk so the connection can be reused
+                    try:
+                        response.read()
+                    except (http.client.HTTPException, OSError) as exc:
+                        raise OllamaError(f"Bad stream from Ollama: {exc}") from exc
+                    finished = True
+                    break
+        finally:
+            if finished:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yield reply tokens as Ollama generates them.
+
+        Closing the generator early drops the connection, which makes Ollama
+        stop generating.
+        """
+        print(f"[…] Streaming from Ollama ({self.model_name})...")
+        return self._stream("/api/generate", self._payload(prompt, stream=True), lambda m: m.get("response", ""))
+
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Like stream(), for a chat message list (see build_messages)."""
+        print(f"[…] Streaming from Ollama ({self.model_name}, {len(messages)} messages)...")
+        return self._stream("/api/chat", self._chat_payload(messages, stream=True),
+                            lambda m: m.get("message", {}).get("content", ""))
+
+    async def _astream(self, make_stream: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        tokens: "asyncio.Queue[Any]" = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+
+        def produce():
+            generator = make_stream()
+            try:
+                for token in generator:
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(tokens.put_nowait, token)
+            except Exception as exc:
+                loop.call_soon_threadsafe(tokens.put_nowait, exc)
+            finally:
+                generator.close()
+                loop.call_soon_threadsafe(tokens.put_nowait, done)
+
+        worker = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await tokens.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            await worker
+
+    def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async iterator over reply tokens; generation runs in a worker thread."""
+        return self._astream(lambda: self.stream(prompt))
+
+    def astream_chat(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Async iterator over chat reply tokens."""
+        return self._astream(lambda: self.stream_chat(messages))
+
+    def warm(self, messages: Optional[List[Dict[str, str]]] = None) -> bool:
+        """
+        Load the model into memory so the first turn doesn't pay for it.
+
+        Without `messages` this is an empty generate request (load only). With
+        `messages` one token is generated for them, which also runs a full forward
+        pass and leaves their prefix (e.g. the system prompt) in the KV cache.
+        """
+        started = time.time()
+        if messages:
+            path, payload = "/api/chat", self._chat_payload(messages, stream=False)
+            payload["options"] = dict(payload.get("options", {}), num_predict=1)
+        else:
+            path, payload = "/api/generate", {"model": self.model_name, "keep_alive": self.keep_alive}
+        try:
+            conn, response = self._open(path, payload)
+            response.read()
+            self._release(conn)
+        except (OllamaError, http.client.HTTPException, OSError) as exc:
+            print(f"[!] Could not preload {self.model_name}: {exc}")
+            return False
+        print(f"[✓] Ollama model {self.model_name} {'warm' if messages else 'loaded'} in {time.time() - started:.1f}s")
+        return True
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
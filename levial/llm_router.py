@@ -0,0 +1,156 @@
+import re
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from .llm import OllamaLLM
+
+# Questions that need reasoning or a longer answer
+_RESEARCH = re.compile(
+    r"\b(explain|why|compare|comparison|difference|research|summari[sz]e|analy[sz]e|pros and cons|"
+    r"in detail|step by step|how does|how do|what causes|plan)\b",
+    re.IGNORECASE,
+)
+
+
+class LLMRouter:
+    CHAT = "chat"
+    TOOL = "tool"
+    EXTRACTION = "extraction"
+    RESEARCH = "research"
+    ROUTES = (CHAT, TOOL, EXTRACTION, RESEARCH)
+
+    def __init__(self,
+                 models: Dict[str, OllamaLLM],
+                 routes: Optional[Dict[str, str]] = None,
+                 default: str = "large",
+                 tool_threshold: float = 0.3,
+                 lexical_tool_threshold: float = 0.4,
+                 research_min_words: int = 25,
+                 window: int = 200):
+        """
+        Sends each request to the small or the large Ollama model by request class.
+
+        User requests are classified without an extra LLM call: "research" for
+        explicit explanation/comparison requests, "tool" if the best-matching
+        MCP tool (ToolIndex scores) clears the threshold for the index's backend,
+        "research" for long utterances, "chat" otherwise. Background prompts
+        (knowledge extraction, history summaries) use the "extraction" route. A request keeps its route for
+        every turn of the agentic loop, so the loop stays on one model and
+        its prompt prefix stays in that model's KV cache.
+
+        Latency is recorded per route (time to first token, total time) over
+        the last `window` requests, to tune the split on the target hardware.
+
+        Args:
+            models: OllamaLLM per model slot ("small", "large").
+            routes: Model slot per route; routes not listed use `default`.
+            default: Slot used for unlisted routes and when a slot's model is unavailable.
+            tool_threshold: Minimum tool relevance (embedding cosine) for the "tool" route.
+            lexical_tool_threshold: The same for the TF-IDF fallback, whose scores run higher.
+            research_min_words: Utterances at least this long count as "research".
+            window: Latency samples kept per route.
+        """
+        self.models = models
+        self.routes = routes or {}
+        self.default = default
+        self.tool_threshold = tool_threshold
+        self.lexical_tool_threshold = lexical_tool_threshold
+        self.research_min_words = research_min_words
+        self.unavailable: set = set()
+        self._first_token: Dict[str, Deque[float]] = {route: deque(maxlen=window) for route in self.ROUTES}
+        self._total: Dict[str, Deque[float]] = {route: deque(maxlen=window) for route in self.ROUTES}
+        self.requests: Dict[str, int] = {route: 0 for route in self.ROUTES}
+
+    def slot(self, route: str) -> str:
+        slot = self.routes.get(route, self.default)
+        if slot not in self.models or slot in self.unavailable:
+            return self.default
+        return slot
+
+    def llm(self, route: str) -> OllamaLLM:
+        return self.models[self.slot(route)]
+
+    def classify(self, transcript: str, tool_index=None) -> str:
+        """Route of a user request."""
+        # Explicit cues win: "explain how X works" shares words with many tool descriptions
+        if _RESEARCH.search(transcript):
+            return self.RESEARCH
+        if tool_index is not None and tool_index.tools:
+            threshold = self.lexical_tool_threshold if tool_index.lexical else self.tool_threshold
+            scores = tool_index.scores(transcript)
+            if scores and max(scores) >= threshold:
+                return self.TOOL
+        if len(transcript.split()) >= self.research_min_words:
+            return self.RESEARCH
+        return self.CHAT
+
+    def warm(self, messages: Optional[List[Dict[str, str]]] = None) -> bool:
+        """Preload every model; a slot whose model can't be loaded falls back to `default`."""
+        ready = True
+        for slot, llm in self.models.items():
+            if llm.warm(messages):
+                self.unavailable.discard(slot)
+            elif slot != self.default:
+                print(f"[!] {llm.model_name} unavailable; routing its requests to {self.models[self.default].model_name}")
+                self.unavailable.add(slot)
+            else:
+                ready = False
+        return ready
+
+    def _record(self, route: str, first_token: Optional[float], total: Optional[float]) -> None:
+        self.requests[route] += 1
+        if first_token is not None:
+            self._first_token[route].append(first_token)
+        if total is not None:
+            self._total[route].append(total)
+
+    async def astream_chat(self, route: str, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """OllamaLLM.astream_chat on the route's model, timed."""
+        started = time.time()
+        first_token = None
+        completed = False
+        stream = self.llm(route).astream_chat(messages)
+        try:
+            async for token in stream:
+                if first_token is None:
+                    first_token = time.time() - started
+                yield token
+            completed = True
+        finally:
+            await stream.aclose()
+            # Interrupted replies (barge-in) only count for time to first token
+            self._record(route, first_token, time.time() - started if completed else None)
+
+    def query_fn(self, route: str) -> Callable[[str], str]:
+        """A timed `prompt -> reply` function on the route's model (for background prompts)."""
+        def query(prompt: str) -> str:
+            started = time.time()
+            reply = self.llm(route).query(prompt)
+            elapsed = time.time() - started
+            self._record(route, None, elapsed)
+            return reply
+        return query
+
+    @staticmethod
+    def _percentile(samples, q: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route request counts and latencies (seconds) over the recent window."""
+        stats = {}
+        for route in self.ROUTES:
+            if not self.requests[route]:
+                continue
+            first, total = self._first_token[route], self._total[route]
+            stats[route] = {
+                "model": self.llm(route).model_name,
+                "requests": self.requests[route],
+                "first_token_p50": self._percentile(first, 0.5),
+                "total_p50": self._percentile(total, 0.5),
+                "total_p95": self._percentile(total, 0.95),
+            }
+        return stats
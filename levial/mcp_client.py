@@ -1,4 +1,5 @@
 import asyncio
+import json
 import logging
 from typing import List, Dict, Any, Optional
 from contextlib import AsyncExitStack
@@ -6,6 +7,8 @@ from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from .tool_index import ToolIndex
+
 logger = logging.getLogger(__name__)
 
 class MCPClient:
@@ -20,6 +23,7 @@ class MCPClient:
         self.sessions: Dict[str, ClientSession] = {}
         self.exit_stack = AsyncExitStack()
         self.tools: List[Dict[str, Any]] = []
+        self.tool_index: Optional[ToolIndex] = None
 
     async def start(self):
         """
@@ -80,6 +84,32 @@ class MCPClient:
         
         logger.info(f"Discovered {len(self.tools)} tools across {len(self.sessions)} servers.")
 
+        retrieval = self.config.get("tool_retrieval", {})
+        if retrieval.get("enabled", True):
+            # Renderings and embeddings are computed once per tool list, off the event loop
+            self.tool_index = await asyncio.to_thread(
+                ToolIndex,
+                self.tools,
+                top_k=retrieval.get("top_k", 5),
+                embedding=retrieval.get("embedding", "default")
+            )
+        else:
+            self.tool_index = None
+
+    def tool_prompt(self, query: str) -> str:
+        """
+        Tool catalog for a prompt: the tools relevant to `query` if the index is
+        enabled, otherwise the full schema of every tool.
+        """
+        if not self.tools:
+            return ""
+        if self.tool_index is None:
+            return json.dumps(self.tools, indent=2)
+        text = self.tool_index.prompt(query)
+        logger.info(f"Selected tools {self.tool_index.last_selected}; "
+                    f"{self.tool_index.tokens_saved} prompt tokens saved over {self.tool_index.selections} requests")
+        return text
+
     async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
         Call a specific tool on a specific server.
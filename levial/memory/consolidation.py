@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeConsolidator:
+    def __init__(self,
+                 memory_manager,
+                 llm_query_fn: Callable[[str], str],
+                 batch_turns: int = 5,
+                 idle_sec: Optional[float] = 120.0,
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Batches turns for knowledge extraction.
+
+        Turns are buffered and extracted with a single LLM call once `batch_turns`
+        have accumulated, or once the conversation has been idle for `idle_sec`,
+        instead of one extraction call per turn.
+
+        Args:
+            memory_manager: MemoryManager whose profile is updated.
+            llm_query_fn: Function to call LLM (prompt -> text).
+            batch_turns: Turns per extraction call.
+            idle_sec: Extract a partial batch after this much inactivity (None: only full batches).
+            on_update: Called with the new knowledge after a batch added something.
+        """
+        self.memory_manager = memory_manager
+        self.llm_query_fn = llm_query_fn
+        self.batch_turns = batch_turns
+        self.idle_sec = idle_sec
+        self.on_update = on_update
+        self._pending: List[Tuple[str, str]] = []
+        self._last_turn_at = time.time()
+        self._running = False
+        self._lock = threading.Lock()
+        self.turns_seen = 0
+        self.llm_calls = 0
+
+    def add_turn(self, user_message: str, assistant_message: str) -> None:
+        with self._lock:
+            self._pending.append((user_message, assistant_message))
+            self._last_turn_at = time.time()
+            self.turns_seen += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True if a batch should be extracted now (and none is running)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._running or not self._pending:
+                return False
+            if len(self._pending) >= self.batch_turns:
+                return True
+            return self.idle_sec is not None and now - self._last_turn_at >= self.idle_sec
+
+    def claim(self) -> bool:
+        """Reserve the next run, so a batch is only scheduled once. Returns False if one is running."""
+        with self._lock:
+            if self._running or not self._pending:
+                return False
+            self._running = True
+            return True
+
+    def release(self) -> None:
+        """Undo claim() if the run could not be scheduled."""
+        with self._lock:
+            self._running = False
+
+    def consolidate(self) -> Dict[str, Any]:
+        """Extract knowledge from all pending turns (call after claim(), e.g. in a background task)."""
+        with self._lock:
+            self._running = True
+            batch, self._pending = self._pending, []
+        try:
+            if not batch:
+                return {"facts": {}, "interests": [], "name": None}
+            self.llm_calls += 1
+            knowledge = self.memory_manager.consolidate_knowledge(batch, self.llm_query_fn)
+            logger.info(f"Consolidated {len(batch)} turns ({self.llm_calls} extraction calls for {self.turns_seen} turns)")
+            if self.on_update and (knowledge.get("name") or knowledge.get("facts") or knowledge.get("interests")):
+                self.on_update(knowledge)
+            return knowledge
+        finally:
+            with self._lock:
+                self._running = False
@@ -1,6 +1,7 @@
+import json
 import logging
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from pathlib import Path
 
 from .vector_store import VectorStore
@@ -70,12 +71,44 @@ class MemoryManager:
         Returns:
             Dict with extracted knowledge
         """
+        return self.consolidate_knowledge([(user_message, assistant_message)], llm_query_fn)
+
+    def consolidate_knowledge(self, turns: List[Tuple[str, str]], llm_query_fn) -> Dict[str, Any]:
+        """
+        Extract knowledge from a batch of turns with one LLM call and merge it into the profile.
+        
+        The prompt includes what the profile already knows, so the model only reports
+        new or changed facts, and facts spread over several turns can be combined.
+        Results are deduplicated against the profile before anything is written.
+        
+        Args:
+            turns: (user message, assistant message) pairs, oldest first
+            llm_query_fn: Function to call LLM
+        
+        Returns:
+            Dict with the knowledge that was actually new
+        """
+        empty = {"facts": {}, "interests": [], "name": None}
+        if not turns:
+            return empty
+
+        profile = self.user_profile.get_profile()
+        known = json.dumps({
+            "name": profile.get("name"),
+            "facts": profile.get("facts", {}),
+            "interests": profile.get("interests", []),
+        })
+        conversation = "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant in turns)
         extraction_prompt = f"""Based on this conversation, extract any facts about the user that should be remembered.
 
-User: {user_message}
-Assistant: {assistant_message}
+Already known about the user:
+{known}
 
-Extract ONLY factual information about the user (name, preferences, interests, locations, relationships, etc.).
+Conversation:
+{conversation}
+
+Extract ONLY factual information about the user (name, preferences, interests, locations, relationships, etc.)
+that is NOT already known or that changes what is known. Combine details mentioned across several turns.
 Format your response as JSON:
 {{
   "facts": {{
@@ -93,39 +126,58 @@ Only extract information explicitly stated or strongly implied. Do not make assu
             # Call LLM to extract knowledge
             result = llm_query_fn(extraction_prompt)
             
-            # Parse JSON from response
-            import json
             # Try to find JSON in the response
             start_idx = result.find('{')
             end_idx = result.rfind('}')
-            if start_idx != -1 and end_idx != -1:
-                json_str = result[start_idx:end_idx+1]
-                knowledge = json.loads(json_str)
-                
-                # Update user profile with extracted knowledge
-                if knowledge.get("name"):
-                    self.user_profile.profile_data["name"] = knowledge["name"]
-                
-                if knowledge.get("facts"):
-                    for key, value in knowledge["facts"].items():
-                        self.user_profile.profile_data["facts"][key] = value
-                
-                if knowledge.get("interests"):
-                    for interest in knowledge["interests"]:
-                        self.user_profile.update_interest(interest)
-                
-                # Save the updated profile
-                self.user_profile.save_profile()
-                
-                logger.info(f"Extracted knowledge: {knowledge}")
-                return knowledge
-            else:
+            if start_idx == -1 or end_idx == -1:
                 logger.warning("No JSON found in LLM response for knowledge extraction")
-                return {"facts": {}, "interests": [], "name": None}
-                
+                return empty
+            knowledge = json.loads(result[start_idx:end_idx+1])
         except Exception as e:
             logger.error(f"Knowledge extraction failed: {e}")
-            return {"facts": {}, "interests": [], "name": None}
+            return empty
+
+        new = self._merge_knowledge(knowledge)
+        logger.info(f"Extracted knowledge from {len(turns)} turns: {new}")
+        return new
+
+    def _merge_knowledge(self, knowledge: Dict[str, Any]) -> Dict[str, Any]:
+        """Write only what the profile doesn't already hold; save once."""
+        with self.user_profile.lock:
+            profile = self.user_profile.profile_data
+            new = {"facts": {}, "interests": [], "name": None}
+
+            name = knowledge.get("name")
+            if isinstance(name, str) and name.strip().lower() not in ("", "user", str(profile.get("name", "")).lower()):
+                profile["name"] = new["name"] = name.strip()
+
+            facts = profile.setdefault("facts", {})
+            existing_keys = {self._normalize_key(key): key for key in facts}
+            for key, value in (knowledge.get("facts") or {}).items():
+                if value in (None, "", [], {}):
+                    continue
+                current_key = existing_keys.get(self._normalize_key(key), key)
+                if str(facts.get(current_key, "")).strip().lower() == str(value).strip().lower():
+                    continue
+                facts[current_key] = value
+                new["facts"][current_key] = value
+
+            interests = profile.setdefault("interests", [])
+            known_interests = {str(interest).strip().lower() for interest in interests}
+            for interest in knowledge.get("interests") or []:
+                normalized = str(interest).strip().lower()
+                if normalized and normalized not in known_interests:
+                    interests.append(str(interest).strip())
+                    known_interests.add(normalized)
+                    new["interests"].append(str(interest).strip())
+
+            if new["name"] or new["facts"] or new["interests"]:
+                self.user_profile.save_profile()
+            return new
+
+    @staticmethod
+    def _normalize_key(key: str) -> str:
+        return "_".join(str(key).lower().replace("-", " ").replace("_", " ").split())
 
     def update_knowledge(self, updates: Dict[str, Any]):
         """
@@ -135,18 +187,19 @@ Only extract information explicitly stated or strongly implied. Do not make assu
             updates: Dictionary containing updates (name, interests, facts)
         """
         try:
-            if "name" in updates:
-                self.user_profile.profile_data["name"] = updates["name"]
-            
-            if "interests" in updates:
-                self.user_profile.profile_data["interests"] = updates["interests"]
-                
-            if "facts" in updates:
-                # Merge facts instead of overwriting entirely if possible, 
-                # but for simplicity let's allow full overwrite if passed
-                self.user_profile.profile_data["facts"] = updates["facts"]
-                
-            self.user_profile.save_profile()
+            with self.user_profile.lock:
+                if "name" in updates:
+                    self.user_profile.profile_data["name"] = updates["name"]
+
+                if "interests" in updates:
+                    self.user_profile.profile_data["interests"] = updates["interests"]
+
+                if "facts" in updates:
+                    # Merge facts instead of overwriting entirely if possible,
+                    # but for simplicity let's allow full overwrite if passed
+                    self.user_profile.profile_data["facts"] = updates["facts"]
+
+                self.user_profile.save_profile()
             logger.info(f"Manual profile update: {updates}")
             return self.user_profile.get_profile()
         except Exception as e:
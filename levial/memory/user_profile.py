@@ -1,5 +1,7 @@
+import copy
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, List
 
@@ -14,6 +16,8 @@ class UserProfile:
             profile_path: Path to the user_profile.json file.
         """
         self.profile_path = Path(profile_path)
+        # Background knowledge extraction writes the profile while turns read it
+        self.lock = threading.RLock()
         self.profile_data: Dict[str, Any] = self._load_profile()
 
     def _load_profile(self) -> Dict[str, Any]:
@@ -40,22 +44,25 @@ class UserProfile:
     def save_profile(self):
         """Save current profile to disk."""
         try:
-            with open(self.profile_path, 'w') as f:
+            with self.lock, open(self.profile_path, 'w') as f:
                 json.dump(self.profile_data, f, indent=2)
         except Exception as e:
             logger.error(f"Failed to save profile: {e}")
 
     def get_profile(self) -> Dict[str, Any]:
-        """Return the full profile."""
-        return self.profile_data
+        """Return a copy of the full profile."""
+        with self.lock:
+            return copy.deepcopy(self.profile_data)
 
     def update_interest(self, topic: str):
         """Add an interest if not present."""
-        if topic not in self.profile_data["interests"]:
-            self.profile_data["interests"].append(topic)
-            self.save_profile()
+        with self.lock:
+            if topic not in self.profile_data["interests"]:
+                self.profile_data["interests"].append(topic)
+                self.save_profile()
 
     def update_preference(self, key: str, value: Any):
         """Update a preference."""
-        self.profile_data["preferences"][key] = value
-        self.save_profile()
+        with self.lock:
+            self.profile_data["preferences"][key] = value
+            self.save_profile()
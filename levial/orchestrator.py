@@ -3,24 +3,36 @@ import time
 import asyncio
 import subprocess
 import json
-from typing import List, Tuple, Dict, Any, Callable
+from typing import List, Tuple, Dict, Any, Callable, Optional
 from pathlib import Path
-import queue
-import sounddevice as sd
 import numpy as np
 import threading
 import time
 import random
+from contextlib import closing
 
 from .config import ConfigManager
-from .audio import AudioCapture, AudioPlayer
-from .asr import WhisperASR
-from .tts import PiperTTS
-from .llm import OllamaLLM
+from .audio import AudioCapture, AudioPlayer, PcmRecorder
+from .audio_bus import MicrophoneBus
+from .audio_sources import create_audio_source
+from .asr import CascadeASR, CommandRecognizer, WhisperASR, WhisperServerASR, StreamingTranscriber
+from .tts import PiperTTS, PiperVoiceTTS
+from .tts_cache import CachedTTS, TTSCache
+from .llm import OllamaError, OllamaLLM
+from .llm_router import LLMRouter
 from .mcp_client import MCPClient
 from .wake_word import WakeWordListener, SpeechDetector
+from .endpointing import Endpointer
+from .preprocess import SpeechTrimmer
+from .speech_pipeline import SpeechPipeline
+from .history import HistoryManager
+from .response_cache import ResponseCache
+from .background import BackgroundTaskQueue
+from .startup import StartupTimeline
+from .level_meter import LevelMeter
 
 from .memory.manager import MemoryManager
+from .memory.consolidation import KnowledgeConsolidator
 
 class InputListener:
     def __init__(self, callback: Callable[[], None]):
@@ -50,24 +62,129 @@ class InputListener:
 class ConversationOrchestrator:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
+        # Single long-lived microphone stream shared by every state
+        self.mic_bus = MicrophoneBus(
+            sample_rate=self.config.mic_sample_rate,
+            source=create_audio_source(self.config.audio_source, sample_rate=self.config.mic_sample_rate)
+        )
         self.audio_capture = AudioCapture(
             sample_rate=self.config.mic_sample_rate,
             channels=self.config.mic_channels,
-            max_duration_sec=self.config.recording_max_sec
+            max_duration_sec=self.config.recording_max_sec,
+            bus=self.mic_bus
         )
-        self.asr = WhisperASR(
-            bin_path=self.config.whisper_bin_path,
-            model_path=self.config.whisper_model_path,
-            base_dir=self.config.base_dir
-        )
-        self.tts = PiperTTS(
+        if self.config.asr.get("mode", "server") == "server":
+            # Warm worker: model loaded once in start(), falls back to whisper-cli
+            self.asr = WhisperServerASR(
+                server_bin_path=self.config.whisper_server_bin_path,
+                bin_path=self.config.whisper_bin_path,
+                model_path=self.config.whisper_model_path,
+                base_dir=self.config.base_dir,
+                port=self.config.asr.get("port", 8910)
+            )
+        else:
+            self.asr = WhisperASR(
+                bin_path=self.config.whisper_bin_path,
+                model_path=self.config.whisper_model_path,
+                base_dir=self.config.base_dir
+            )
+        # Small model kept warm next to the main one (barge-in commands, cascade)
+        fast_asr = None
+        if self.config.asr.get("mode", "server") == "server" and self.config.asr.get("command_model"):
+            fast_asr = WhisperServerASR(
+                server_bin_path=self.config.whisper_server_bin_path,
+                bin_path=self.config.whisper_bin_path,
+                model_path=self.config.base_dir / self.config.asr["command_model"],
+                base_dir=self.config.base_dir,
+                port=self.config.asr.get("command_port", 8911)
+            )
+        # Barge-in commands: small model first, full model for anything else
+        self.command_recognizer = CommandRecognizer(self.asr, fast_asr)
+        cascade = self.config.asr.get("cascade", {})
+        if fast_asr and cascade.get("enabled", False):
+            # Utterances: small model first, escalate to the profile's model on low confidence
+            self.asr = CascadeASR(
+                fast_asr,
+                self.asr,
+                logprob_threshold=cascade.get("logprob_threshold", -0.7),
+                no_speech_threshold=cascade.get("no_speech_threshold", 0.6)
+            )
+        # Non-command interruption, handled as the next request
+        self.pending_transcript: Optional[str] = None
+        # Partial transcripts while the user is still speaking
+        self.streaming_asr = None
+        if self.config.asr.get("streaming", True):
+            self.streaming_asr = StreamingTranscriber(
+                self.asr,
+                sample_rate=self.config.mic_sample_rate,
+                interval_sec=self.config.asr.get("partial_interval_sec", 1.0),
+                window_sec=self.config.asr.get("window_sec", 8.0),
+                on_partial=lambda text: self._emit_status("partial_transcript", {"text": text}),
+                partial_asr=fast_asr
+            )
+        tts_class = PiperVoiceTTS if self.config.tts.get("backend", "python") == "python" else PiperTTS
+        self.tts = tts_class(
             model_path=self.config.piper_model_path,
             base_dir=self.config.base_dir
         )
-        self.llm = OllamaLLM(model_name=self.config.llm_model_name)
+        # Repeated phrases come from the cache; fillers are synthesized at startup
+        tts_cache = self.config.tts_cache
+        if tts_cache.get("enabled", True):
+            self.tts = CachedTTS(self.tts, TTSCache(
+                self.config.artifacts_dir / "tts_cache",
+                voice=self.config.piper_model_path.name,
+                params={"sample_rate": self.tts.sample_rate},
+                memory_bytes=int(tts_cache.get("memory_mb", 32) * 1024 * 1024),
+                disk_bytes=int(tts_cache.get("disk_mb", 256) * 1024 * 1024)
+            ))
+        self.filler_phrases: List[str] = tts_cache.get("fillers", [])
+        self.filler_after_sec: Optional[float] = tts_cache.get("filler_after_sec", 1.5)
+        self.llm = OllamaLLM(
+            model_name=self.config.llm_model_name,
+            keep_alive=self.config.llm.get("keep_alive", "30m"),
+            options=self.config.llm_options
+        )
+        # Requests go to the small or the large model by class (chat, tool, extraction, research)
+        routing = self.config.llm.get("routing", {})
+        models = {"large": self.llm}
+        small_model = self.config.llm_small_model
+        if routing.get("enabled", True) and small_model and small_model != self.llm.model_name:
+            models["small"] = OllamaLLM(
+                model_name=small_model,
+                keep_alive=self.config.llm.get("keep_alive", "30m"),
+                options=self.config.llm_options
+            )
+        self.router = LLMRouter(
+            models,
+            routes=routing.get("routes"),
+            tool_threshold=routing.get("tool_threshold", 0.3),
+            lexical_tool_threshold=routing.get("lexical_tool_threshold", 0.4),
+            research_min_words=routing.get("research_min_words", 25)
+        )
         self.mcp_client = MCPClient(self.config.config_data)
-        self.memory_manager = MemoryManager(self.config.base_dir)
-        self.history: List[Tuple[str, str]] = []
+        # Final replies to repeated questions, reused without calling the LLM
+        response_cache = self.config.response_cache
+        self.response_cache = ResponseCache(
+            threshold=response_cache.get("threshold", 0.92),
+            ttl_sec=response_cache.get("ttl_sec"),
+            max_entries=response_cache.get("max_entries", 256),
+            embedding=response_cache.get("embedding", "default")
+        ) if response_cache.get("enabled", True) else None
+        # Models are loaded concurrently in start() (see _warm_up), not here:
+        # the server constructs the orchestrator on its event loop
+        self.memory_manager: Optional[MemoryManager] = None
+        self.consolidator: Optional[KnowledgeConsolidator] = None
+        self.startup_timeline: Optional[StartupTimeline] = None
+        # Memory writes and knowledge extraction run after the reply, off the critical path
+        self.background = BackgroundTaskQueue(max_concurrency=2)
+        # Token-budgeted history; evicted turns are summarized in the background
+        self.history = HistoryManager(
+            max_turns=self.config.max_history_turns,
+            token_budget=self.config.history_token_budget,
+            max_tool_output_tokens=self.config.max_tool_output_tokens,
+            summarize_fn=self.router.query_fn(LLMRouter.EXTRACTION),
+            schedule=lambda job: self.background.submit(job, name="history summary", priority=BackgroundTaskQueue.LOW)
+        )
         
         # Audio Player instance
         self.audio_player = AudioPlayer()
@@ -75,22 +192,37 @@ class ConversationOrchestrator:
         # Wake Word & VAD
         self.wake_event = threading.Event()
         self.detected_wake_word = None
+        # Bus position right after the wake word; the command recording starts here
+        self.wake_position = None
+        self._wake_subscription = None
+        self._barge_in_task: Optional[asyncio.Future] = None
         
-        def wake_callback(model_name: str):
-            self.detected_wake_word = model_name
-            self.wake_event.set()
-
-        self.wake_listener = WakeWordListener(
-            callback=wake_callback,
-            model_paths=self.config.wake_word_model_paths
-        )
-        self.speech_detector = SpeechDetector()
+        self.wake_listener: Optional[WakeWordListener] = None
+        self.speech_detector: Optional[SpeechDetector] = None
         
         # Status Callback for WebSocket
         self.status_callback = None
         
         # Configurable Parameters
         self.silence_duration = 1.5  # Default value, can be updated via WebSocket
+
+        # End-of-speech detection (VAD + adaptive noise floor), created in _load_vad
+        self.endpointer: Optional[Endpointer] = None
+        # Cut leading/trailing non-speech before Whisper sees the utterance
+        self.trimmer = None
+        if self.config.preprocess.get("trim_silence", True):
+            self.trimmer = SpeechTrimmer(
+                sample_rate=self.mic_bus.sample_rate,
+                pad_sec=self.config.preprocess.get("pad_sec", 0.25),
+                **self.config.endpointing
+            )
+
+        # Audio level telemetry for the UI, published at a fixed rate while listening
+        self.level_meter = LevelMeter(
+            callback=lambda reading: self._emit_status("audio_level", reading),
+            sample_rate=self.mic_bus.sample_rate,
+            **self.config.audio_level
+        )
         self.proactivity_level = 0.0 # 0.0 to 1.0
         self.last_interaction_time = time.time()
         self.is_proactive_trigger = False
@@ -115,6 +247,8 @@ class ConversationOrchestrator:
         """Update orchestrator configuration dynamically."""
         if "silence_duration" in config:
             self.silence_duration = config["silence_duration"]
+            if self.endpointer is not None:
+                self.endpointer.max_silence_sec = self.silence_duration
             print(f"[Config] Updated silence_duration to {self.silence_duration}s")
         if "proactivity_level" in config:
             self.proactivity_level = float(config["proactivity_level"])
@@ -126,20 +260,141 @@ class ConversationOrchestrator:
         if not self.wake_event.is_set():
             print("[!] Manual wake trigger received")
             self.detected_wake_word = "Manual Trigger"
+            self.wake_position = self.mic_bus.position
             self.wake_event.set()
 
     async def start(self):
         """Async entry point to initialize MCP and run the loop."""
-        print("Initializing MCP Client...")
-        await self.mcp_client.start()
+        try:
+            await self._warm_up()
+        except Exception as e:
+            self._emit_status("error", {"message": f"Startup failed: {e}"})
+            self.asr.stop()
+            self.command_recognizer.stop()
+            await self.mcp_client.stop()
+            raise
+        if isinstance(self.tts, CachedTTS):
+            threading.Thread(target=self._prewarm_tts, daemon=True).start()
         
+        self.background.start()
+        self.mic_bus.start()
         self.input_listener.start()
-        await self.run_loop()
+        # Only now is every engine loaded and the first turn hot
+        self._emit_status("agent_started", {"startup": self.startup_timeline.report()})
+        try:
+            await self.run_loop()
+        finally:
+            # Don't lose turns collected since the last batch
+            if self.consolidator.claim():
+                self.background.submit(self._consolidate_knowledge, name="knowledge consolidation")
+            if self.background.pending:
+                print(f"[…] Finishing {self.background.pending} background tasks...")
+            # Bounded so a stop/restart from the server doesn't overlap two agents
+            if not await self.background.drain(timeout=self.config.knowledge.get("shutdown_drain_sec", 3)):
+                dropped = self.background.clear()
+                print(f"[!] Background tasks still running at shutdown; dropped {dropped} queued")
+            await self.background.stop()
+            self.mic_bus.stop()
+            self.audio_player.close()
+            if isinstance(self.asr, CascadeASR) and self.asr.requests:
+                stats = self.asr.stats()
+                saved = stats["latency_saved_sec"]
+                print(f"[i] ASR cascade: {stats['escalations']}/{stats['requests']} escalated"
+                      + (f", ~{saved:.1f}s decode time saved" if saved is not None else ""))
+            if self.response_cache and self.response_cache.hits + self.response_cache.misses:
+                stats = self.response_cache.stats()
+                print(f"[i] Response cache: {stats['hits']} hits, {stats['misses']} misses ({stats['stale']} stale), "
+                      f"{stats['llm_calls_saved']} LLM calls saved")
+            for route, stats in self.router.stats().items():
+                first = stats["first_token_p50"]
+                total = stats["total_p50"]
+                print(f"[i] LLM route {route} ({stats['model']}): {stats['requests']} requests"
+                      + (f", first token {first:.1f}s" if first is not None else "")
+                      + (f", total {total:.1f}s (p95 {stats['total_p95']:.1f}s)" if total is not None else ""))
+            if self.trimmer and self.trimmer.turns:
+                print(f"[i] Silence trimming: {self.trimmer.saved_sec:.1f}s of {self.trimmer.audio_sec:.1f}s not sent to ASR"
+                      f" ({self.trimmer.dropped} utterances without speech dropped)")
+            self.asr.stop()
+            self.command_recognizer.stop()
 
         print("Shutting down MCP Client...")
         await self.mcp_client.stop()
         self.input_listener.stop()
 
+    async def _warm_up(self):
+        """Load and warm every engine concurrently, then print the startup timeline."""
+        print("[…] Loading models...")
+        self.startup_timeline = StartupTimeline()
+        await self.startup_timeline.gather({
+            "mcp": self.mcp_client.start,
+            "memory": self._load_memory,
+            "wake word": self._load_wake_word,
+            "vad": self._load_vad,
+            "asr": self._warm_asr,
+            "command asr": self._warm_command_asr,
+            "tts": self._warm_tts,
+            "llm": self._warm_llm,
+        }, required=("memory", "wake word", "vad"))
+        self.startup_timeline.print()
+
+    def _load_memory(self):
+        self.memory_manager = MemoryManager(self.config.base_dir)
+        # First query loads the embedding model used for memory retrieval
+        self.memory_manager.get_relevant_context("warm up")
+        if self.response_cache:
+            self.response_cache.embed("warm up")
+        # Knowledge is extracted from batches of turns, not after every reply
+        knowledge = self.config.knowledge
+        self.consolidator = KnowledgeConsolidator(
+            self.memory_manager,
+            llm_query_fn=self.router.query_fn(LLMRouter.EXTRACTION),
+            batch_turns=knowledge.get("batch_turns", 5),
+            idle_sec=knowledge.get("idle_sec", 120),
+            on_update=self._on_knowledge_update
+        )
+
+    def _load_wake_word(self):
+        def wake_callback(model_name: str):
+            self.detected_wake_word = model_name
+            if self._wake_subscription is not None:
+                self.wake_position = self._wake_subscription.position
+            self.wake_event.set()
+
+        self.wake_listener = WakeWordListener(
+            callback=wake_callback,
+            model_paths=self.config.wake_word_model_paths
+        )
+        # One prediction initializes the ONNX sessions and feature buffers
+        self.wake_listener.model.predict(np.zeros(self.wake_listener.chunk_size, dtype=np.int16))
+        self.wake_listener.model.reset()
+
+    def _load_vad(self):
+        self.speech_detector = SpeechDetector()
+        # silence_duration only applies when the VAD model is unavailable
+        self.endpointer = Endpointer(
+            sample_rate=self.mic_bus.sample_rate,
+            max_silence_sec=self.silence_duration,
+            **self.config.endpointing
+        )
+
+    def _warm_asr(self) -> bool:
+        return self.asr.start() and self.asr.warm()
+
+    def _warm_command_asr(self) -> bool:
+        if not self.command_recognizer.start():
+            return False
+        # The cascade's warm-up already covers a shared small-model server
+        if self.command_recognizer.fast is getattr(self.asr, "fast", None):
+            return True
+        return self.command_recognizer.warm()
+
+    def _warm_tts(self) -> bool:
+        return self.tts.start() and self.tts.warm()
+
+    def _warm_llm(self) -> bool:
+        # A one-token reply to the fixed system prompt: loads the weights and caches that prefix
+        return self.router.warm(self.llm.build_messages([], "Hello"))
+
     def run(self):
         """Entry point for the main script."""
         try:
@@ -147,115 +402,140 @@ class ConversationOrchestrator:
         except KeyboardInterrupt:
             print("\nStopped by user.")
 
-    def _get_audio_stream(self, q: queue.Queue):
-        def callback(indata, frames, time, status):
-            if status:
-                print(status, file=sys.stderr)
-            # Flatten to 1D array
-            q.put(indata.flatten())
+    async def _idle_and_listen(self) -> Optional[str]:
+        """
+        Wait for the wake word (or a proactive trigger) and record the command.
+
+        Returns the transcript, or None if nothing usable was heard or shutdown
+        was requested.
+        """
+        # --- STATE: IDLE (Listening for Wake Word) ---
+        print("[State] IDLE - Waiting for wake word...")
+        self._emit_status("idle")
+        self.wake_event.clear()
+        self.detected_wake_word = None
+        self.wake_position = None
+        self.is_proactive_trigger = False
         
-        return sd.InputStream(
-            samplerate=16000, # openWakeWord expects 16k
-            channels=1,
-            dtype="int16",    # openWakeWord works best with int16
-            blocksize=1280,   # Force 1280 samples per chunk (80ms)
-            callback=callback
-        )
+        self._wake_subscription = self.mic_bus.subscribe()
+        self.wake_listener.start(self._wake_subscription)
+        
+        # Wait for wake word OR shutdown
+        while not self.wake_event.is_set() and not self.shutdown_event.is_set():
+            # Wait in a thread so background tasks keep running while idle
+            await asyncio.to_thread(self.wake_event.wait, 0.5)
+            self._schedule_consolidation()
 
-    async def run_loop(self):
-        print("Levial - Local Voice Assistant (v2.0 Agentic)")
-        print("Say 'Hey Jarvis' (proxy for Levial) to wake me up.")
-        print("Say 'Alexa' (proxy for Goodbye) to exit immediately.")
-        print("Say 'Thank you' to stop speaking.")
+            if self._wake_subscription.exhausted:
+                print("[i] Audio source finished.")
+                self.shutdown_event.set()
+                break
+            
+            # Proactivity Check
+            if self.proactivity_level > 0:
+                idle_time = time.time() - self.last_interaction_time
+                if idle_time > 30: # 30s minimum idle
+                    # Chance check (runs every 0.5s)
+                    # Max level (1.0) -> ~1% chance per 0.5s -> ~2% per sec -> ~50s avg wait
+                    if random.random() < (self.proactivity_level * 0.01):
+                        print(f"[Proactive] Triggered! Idle: {idle_time:.1f}s")
+                        self.is_proactive_trigger = True
+                        self.wake_event.set()
+        
+        self.wake_listener.stop()
+        self._wake_subscription.close()
+        self._wake_subscription = None
+        
+        if self.shutdown_event.is_set():
+            return None
 
-        while not self.shutdown_event.is_set():
-            # --- STATE: IDLE (Listening for Wake Word) ---
-            print("[State] IDLE - Waiting for wake word...")
-            self._emit_status("idle")
-            self.wake_event.clear()
-            self.detected_wake_word = None
-            self.is_proactive_trigger = False
+        if self.is_proactive_trigger:
+            print(f"[!] Proactive Interaction Triggered")
+            self._emit_status("wake_word_detected", {"wake_word": "Proactive"})
+            # Skip listening and jump to generation
+            # We construct a prompt for the agent to initiate conversation
+            transcript = "System: The user has been idle. Initiate a conversation based on their interests."
+        else:
+            if self.detected_wake_word and "alexa" in self.detected_wake_word.lower():
+                print("[i] 'Alexa' detected - Pausing listening. Say 'Hey Jarvis' to resume.")
+                self._emit_status("idle")
+                return None  # Return to wake word listening instead of exiting
             
-            audio_q = queue.Queue()
-            stream = self._get_audio_stream(audio_q)
+            # --- STATE: LISTENING (User Command) ---
+            print("[State] LISTENING - Speak now...")
+            self._emit_status("listening")
+            timestamp = int(time.time())
+            audio_path = self.config.artifacts_dir / f"utterance_{timestamp}.wav" if self.config.persist_audio else None
             
-            def stream_callback(n):
-                try:
-                    return audio_q.get(timeout=0.1)
-                except queue.Empty:
-                    return None
+            # Level meter reads the bus alongside the recorder
+            meter_subscription = self.mic_bus.subscribe(self.wake_position)
+            self.level_meter.start(meter_subscription)
 
-            with stream:
-                self.wake_listener.start(stream_callback)
-                
-                # Wait for wake word OR shutdown
-                while not self.wake_event.is_set() and not self.shutdown_event.is_set():
-                    self.wake_event.wait(timeout=0.5)
-                    
-                    # Proactivity Check
-                    if self.proactivity_level > 0:
-                        idle_time = time.time() - self.last_interaction_time
-                        if idle_time > 30: # 30s minimum idle
-                            # Chance check (runs every 0.5s)
-                            # Max level (1.0) -> ~1% chance per 0.5s -> ~2% per sec -> ~50s avg wait
-                            if random.random() < (self.proactivity_level * 0.01):
-                                print(f"[Proactive] Triggered! Idle: {idle_time:.1f}s")
-                                self.is_proactive_trigger = True
-                                self.wake_event.set()
-                
-                self.wake_listener.stop()
-            
-            if self.shutdown_event.is_set():
-                break
+            # Streaming ASR decodes the utterance buffer while it is recorded
+            recorder = PcmRecorder(self.mic_bus.sample_rate, self.config.recording_max_sec)
+            if self.streaming_asr:
+                self.streaming_asr.start(recorder)
 
-            if self.is_proactive_trigger:
-                print(f"[!] Proactive Interaction Triggered")
-                self._emit_status("wake_word_detected", {"wake_word": "Proactive"})
-                # Skip listening and jump to generation
-                # We construct a prompt for the agent to initiate conversation
-                transcript = "System: The user has been idle. Initiate a conversation based on their interests."
-            else:
-                if self.detected_wake_word and "alexa" in self.detected_wake_word.lower():
-                    print("[i] 'Alexa' detected - Pausing listening. Say 'Hey Jarvis' to resume.")
-                    self._emit_status("idle")
-                    continue  # Return to wake word listening instead of exiting
-                
-                # --- STATE: LISTENING (User Command) ---
-                print("[State] LISTENING - Speak now...")
-                self._emit_status("listening")
-                timestamp = int(time.time())
-                audio_path = self.config.artifacts_dir / f"utterance_{timestamp}.wav"
-                
-                # Define volume callback to emit status
-                def volume_callback(level):
-                    # Throttle updates to avoid flooding WebSocket? 
-                    # For now, just emit. The frontend can handle it or we can throttle here.
-                    # Let's throttle to every ~100ms if needed, but for now raw is fine for smoothness.
-                    # Actually, let's scale it up a bit for visibility
-                    scaled_level = min(level * 5, 1.0) 
-                    self._emit_status("audio_level", {"level": scaled_level})
-    
-                # Record until silence
-                recorded_path = await asyncio.to_thread(
+            # Record until silence
+            try:
+                recorded_audio = await asyncio.to_thread(
                     self.audio_capture.record_until_silence, 
                     output_path=audio_path,
                     silence_threshold=0.01, # Adjust based on mic
                     silence_duration=self.silence_duration,
-                    volume_callback=volume_callback
+                    start_position=self.wake_position,
+                    endpointer=self.endpointer,
+                    recorder=recorder
                 )
-                
+            finally:
+                self.level_meter.stop()
+                meter_subscription.close()
+                # Also on errors: the decode thread must not outlive its recorder
+                if self.streaming_asr:
+                    await asyncio.to_thread(self.streaming_asr.stop)
+            
+            if self.shutdown_event.is_set() or recorded_audio is None:
+                if self.shutdown_event.is_set():
+                    return None
+                print("[!] No audio recorded.")
+                return None
+
+            offset = 0
+            if self.trimmer:
+                recorded_audio = self.trimmer.trim(recorded_audio, self.endpointer.speech_bounds_sec)
+                # Streaming has committed text at offsets into the untrimmed buffer
+                offset = self.trimmer.last_offset
+                if recorded_audio is None:
+                    return None
+
+            try:
+                if self.streaming_asr:
+                    transcript = await asyncio.to_thread(self.streaming_asr.finish, recorded_audio, offset)
+                else:
+                    transcript = await asyncio.to_thread(self.asr.transcribe_pcm, recorded_audio, self.mic_bus.sample_rate)
+            except (subprocess.CalledProcessError, RuntimeError, OSError) as exc:
+                print(f"[x] Whisper failed: {exc}")
+                return None
+        return transcript
+
+    async def run_loop(self):
+        print("Levial - Local Voice Assistant (v2.0 Agentic)")
+        print("Say 'Hey Jarvis' (proxy for Levial) to wake me up.")
+        print("Say 'Alexa' (proxy for Goodbye) to exit immediately.")
+        print("Say 'Thank you' to stop speaking.")
+
+        while not self.shutdown_event.is_set():
+            if self.pending_transcript:
+                # A barge-in that was not a command becomes the next request
+                transcript = self.pending_transcript
+                self.pending_transcript = None
+            else:
+                transcript = await self._idle_and_listen()
                 if self.shutdown_event.is_set():
                     break
-                
-                if not recorded_path:
-                    print("[!] No audio recorded.")
-                    continue
-    
-                try:
-                    transcript = await asyncio.to_thread(self.asr.transcribe, recorded_path)
-                except subprocess.CalledProcessError as exc:
-                    print(f"[x] Whisper failed: {exc}")
+                if transcript is None:
                     continue
+            reply = ""
 
             if not transcript:
                 print("[!] Empty transcript.")
@@ -269,7 +549,7 @@ class ConversationOrchestrator:
                 print("Goodbye!")
                 break
 
-            self.history.append(("user", transcript))
+            self.history.append("user", transcript)
             
             # --- Memory Retrieval ---
             context = self.memory_manager.get_relevant_context(transcript)
@@ -279,22 +559,74 @@ class ConversationOrchestrator:
             preferences = user_profile.get("preferences", [])
             prefs_str = ", ".join(preferences) if preferences else ""
             
+            # Relevant tools only; chosen once per request so loop turns share the prompt prefix
+            tools_json = self.mcp_client.tool_prompt(transcript)
+            # The whole agentic loop stays on one model
+            route = self.router.classify(transcript, self.mcp_client.tool_index)
+            print(f"[i] Route: {route} → {self.router.llm(route).model_name}")
+
+            # Tool calls of this request, for the response cache
+            tool_steps: List[Tuple[str, str, str, Dict[str, Any]]] = []
+            tool_outputs: List[str] = []
+            cached = None
+            # Proactive openers are a fixed prompt; each one should be generated fresh
+            use_cache = self.response_cache is not None and not self.is_proactive_trigger
+            if use_cache:
+                cache_key = self.response_cache.context_key(
+                    transcript, self.router.llm(route).model_name, user_profile, [tool.get("name") for tool in self.mcp_client.tools]
+                )
+                cached, cache_vector = await asyncio.to_thread(self.response_cache.lookup, transcript, cache_key)
+                if cached is not None and cached.tool_steps:
+                    # Re-run the tools; the cached reply only holds if their outputs are unchanged
+                    for step in cached.tool_steps:
+                        tool_outputs.append(await self._call_tool(*step[1:]))
+                    if not self.response_cache.validate(cached, tool_outputs):
+                        # Stale, but the fresh outputs spare the LLM the tool-calling turns
+                        tool_steps = list(cached.tool_steps)
+                        for step, observation in zip(tool_steps, tool_outputs):
+                            self.history.append("assistant", step[0])
+                            self.history.append("system", f"Tool Output: {observation}")
+                        cached = None
+
             # --- Agentic Loop ---
             max_turns = 5
             current_turn = 0
+            # Started as soon as a streamed reply begins to play
+            self._barge_in_task = None
+
+            if cached is not None:
+                reply = cached.reply
+                print(f"[i] Cached reply (matched '{cached.transcript}')")
+                print(f"> Assistant: {reply}")
+                self._emit_status("response", {"text": reply, "cached": True})
+                self.history.append("assistant", reply)
+                self.background.submit(self._remember_turn, transcript, reply, name="memory write")
             
-            while current_turn < max_turns and not self.shutdown_event.is_set():
+            while cached is None and current_turn < max_turns and not self.shutdown_event.is_set():
                 current_turn += 1
                 
-                tools_json = json.dumps(self.mcp_client.tools, indent=2)
-                full_prompt = self.llm.build_prompt(self.history, transcript, context=context, tools_json=tools_json, user_preferences=prefs_str) 
+                messages = self.llm.build_messages(self.history.messages(), transcript, context=context, tools_json=tools_json, user_preferences=prefs_str)
 
                 print(f"[State] THINKING (Turn {current_turn})...")
                 self._emit_status("thinking", {"turn": current_turn})
+                # Sentences are spoken while the rest of the reply is generated
+                speech = SpeechPipeline(self.tts, self.audio_player, on_start=self._start_barge_in_monitor)
                 try:
-                    reply = await asyncio.to_thread(self.llm.query, full_prompt)
-                except subprocess.CalledProcessError as exc:
-                    print(f"[x] Ollama error: {exc.stderr}")
+                    query = asyncio.ensure_future(self._generate(speech, messages, route))
+                    if self.filler_after_sec is not None:
+                        # Fill a long pause with a cached acknowledgement
+                        done, _ = await asyncio.wait({query}, timeout=self.filler_after_sec)
+                        if not done and not speech.started:
+                            self._play_filler()
+                    reply = await query
+                except OllamaError as exc:
+                    print(f"[x] Ollama error: {exc}")
+                    # Don't treat a truncated reply (or an earlier tool call) as the answer
+                    reply = ""
+                    if self._barge_in_task is not None:
+                        self.audio_player.stop()
+                        await self._barge_in_task
+                        self._barge_in_task = None
                     break
 
                 # Check for Tool Call (Same logic as before)
@@ -309,44 +641,24 @@ class ConversationOrchestrator:
                             server_name = tool_call.get("server")
                             args = tool_call["arguments"]
                             print(f"[!] Tool Call: {tool_name} on {server_name}")
-                            if server_name:
-                                try:
-                                    result = await self.mcp_client.call_tool(server_name, tool_name, args)
-                                    observation = str(result)
-                                except Exception as e:
-                                    print(f"[!] Tool execution failed: {e}")
-                                    observation = f"Error: Tool execution failed: {e}"
-                            else:
-                                observation = "Error: Server name missing."
-                            self.history.append(("assistant", reply))
-                            self.history.append(("system", f"Tool Output: {observation}"))
+                            observation = await self._call_tool(server_name, tool_name, args)
+                            tool_steps.append((reply, server_name, tool_name, args))
+                            tool_outputs.append(observation)
+                            self.history.append("assistant", reply)
+                            self.history.append("system", f"Tool Output: {observation}")
                             continue
                 except json.JSONDecodeError:
                     pass
 
                 print(f"> Assistant: {reply}")
                 self._emit_status("response", {"text": reply})
-                self.history.append(("assistant", reply))
-                self.memory_manager.add_interaction("user", transcript)
-                self.memory_manager.add_interaction("assistant", reply)
-                
-                # Extract and update knowledge using LLM
-                try:
-                    print("[State] EXTRACTING KNOWLEDGE...")
-                    knowledge = self.memory_manager.extract_and_update_knowledge(
-                        user_message=transcript,
-                        assistant_message=reply,
-                        llm_query_fn=lambda prompt: self.llm.query(prompt)
-                    )
-                    # Broadcast knowledge update to frontend
-                    profile = self.memory_manager.user_profile.get_profile()
-                    self._emit_status("knowledge_update", {
-                        "profile": profile,
-                        "latest_extraction": knowledge
-                    })
-                    print(f"[Knowledge] Updated: {knowledge}")
-                except Exception as e:
-                    print(f"[!] Knowledge extraction failed: {e}")
+                self.history.append("assistant", reply)
+                # Persist and learn from the turn in the background; speech is already playing
+                self.background.submit(self._remember_turn, transcript, reply, name="memory write")
+                self.consolidator.add_turn(transcript, reply)
+                self._schedule_consolidation()
+                if use_cache and not speech.interrupted and not any(o.startswith("Error:") for o in tool_outputs):
+                    self.response_cache.store(transcript, reply, cache_key, tool_steps, tool_outputs, vector=cache_vector)
                 
                 # Break out of loop - we got a final answer (no tool call)
                 break
@@ -355,99 +667,199 @@ class ConversationOrchestrator:
             if reply:
                 print(f"[State] SPEAKING: {reply}")
                 self._emit_status("speaking")
-                self.history.append(("agent", reply))
                 
                 # Update last interaction time
                 self.last_interaction_time = time.time()
                 
-                # Generate TTS
-                try:
-                    audio_file = await asyncio.to_thread(self.tts.synthesize, reply, self.config.artifacts_dir)
-                    self.audio_player.play(audio_file)
-                except Exception as e:
-                    print(f"[x] TTS Error: {e}")
-                    
-                    # Start Barge-In Monitoring
-                    barge_q = queue.Queue()
-                    barge_stream = self._get_audio_stream(barge_q)
+                if self._barge_in_task is None:
+                    # Nothing was streamed (e.g. output that looked like a tool call): speak it now
+                    if self.audio_player.is_playing:
+                        # Let a filler finish rather than cutting it off mid-word
+                        await asyncio.to_thread(self.audio_player.wait, 3.0)
+                    self._speak(reply)
+                    self._start_barge_in_monitor()
+
+                # Barge-In Monitoring while the reply plays
+                int_audio = await self._barge_in_task
+                self._barge_in_task = None
+                if self.shutdown_event.is_set():
+                    break
+
+                if int_audio is not None:
+                    if self.config.persist_audio:
+                        int_path = self.config.artifacts_dir / f"interruption_{int(time.time())}.wav"
+                        self.audio_capture.save_audio_async(int_audio, int_path, sample_rate=self.mic_bus.sample_rate, channels=self.mic_bus.channels)
                     
-                    def barge_callback(n):
-                        try:
-                            return barge_q.get(timeout=0.1)
-                        except queue.Empty:
-                            return None
-
-                    with barge_stream:
-                        self.speech_detector.start(barge_callback)
-                        
-                        # Wait while playing OR speech detected OR shutdown
-                        while self.audio_player.current_process and self.audio_player.current_process.poll() is None:
-                            if self.shutdown_event.is_set():
-                                self.audio_player.stop()
-                                break
-                                
-                            if self.speech_detector.wait_for_speech(timeout=0.1):
-                                print("[!] Barge-In Detected! Stopping TTS.")
-                                self.audio_player.stop()
-                                
-                                # Capture the interruption
-                                print("Listening to interruption...")
-                                int_path = self.config.artifacts_dir / f"interruption_{int(time.time())}.wav"
-                                break
-                        
-                        self.speech_detector.stop()
+                    if self.trimmer:
+                        int_audio = self.trimmer.trim(int_audio, self.endpointer.speech_bounds_sec)
+                        if int_audio is None:
+                            continue
+                    try:
+                        command, int_text = await asyncio.to_thread(
+                            self.command_recognizer.classify, int_audio, self.mic_bus.sample_rate
+                        )
+                    except (subprocess.CalledProcessError, RuntimeError, OSError) as exc:
+                        print(f"[x] Whisper failed: {exc}")
+                        continue
+                    print(f"> Interruption: {int_text}")
                     
-                    if self.shutdown_event.is_set():
+                    if command == CommandRecognizer.STOP:
+                        print("Stopped by user.")
+                        continue # Go to IDLE
+                    elif command == CommandRecognizer.EXIT:
+                        print("Goodbye!")
+                        self.shutdown_event.set()
                         break
+                    elif int_text:
+                        # Not a command: answer it without waiting for the wake word
+                        self.pending_transcript = int_text
 
-                    # If we broke out due to speech, record it
-                    if self.audio_player.current_process is None and self.speech_detector.speech_detected_event.is_set():
-                        # Stop detector to stop consuming queue
-                        self.speech_detector.stop()
-                        
-                        # Get buffered audio (start of utterance)
-                        frames = self.speech_detector.get_buffer()
-                        
-                        # Continue recording from the SAME queue until silence
-                        print("Listening to interruption...")
-                        silence_threshold = 0.01
-                        silence_duration = 1.0
-                        last_sound_time = time.time()
-                        is_speaking = True # We know they started speaking
-                        
-                        while not self.shutdown_event.is_set():
-                            try:
-                                chunk = barge_q.get(timeout=0.1)
-                                frames.append(chunk)
-                                
-                                # Silence Detection
-                                rms = np.sqrt(np.mean(chunk**2))
-                                if rms > silence_threshold:
-                                    last_sound_time = time.time()
-                                
-                                if (time.time() - last_sound_time > silence_duration):
-                                    print("[i] Silence detected.")
-                                    break
-                            except queue.Empty:
-                                continue
-                        
-                        # Save combined audio
-                        int_path = self.config.artifacts_dir / f"interruption_{int(time.time())}.wav"
-                        int_recorded = self.audio_capture.save_audio(frames, int_path)
-                        
-                        if int_recorded:
-                            int_text = await asyncio.to_thread(self.asr.transcribe, int_recorded)
-                            print(f"> Interruption: {int_text}")
-                            
-                            if "thank you" in int_text.lower():
-                                print("Stopped by user.")
-                                break # Exit Turn Loop -> Go to IDLE
-                            elif "goodbye" in int_text.lower():
-                                print("Goodbye!")
-                                self.shutdown_event.set()
-                                break # Exit Turn Loop
-                            else:
-                                pass
-
-                except subprocess.CalledProcessError as exc:
-                    print(f"[x] Piper/playback error: {exc}")
+    def _prewarm_tts(self):
+        started = time.time()
+        try:
+            synthesized = self.tts.prewarm(self.filler_phrases)
+        except (subprocess.CalledProcessError, OSError) as exc:
+            print(f"[!] TTS prewarm failed: {exc}")
+            return
+        if synthesized:
+            print(f"[✓] Prewarmed {synthesized} TTS phrases in {time.time() - started:.1f}s")
+
+    def _play_filler(self) -> bool:
+        """Play a random filler phrase if it is already cached. Returns True if one started."""
+        if not self.filler_phrases or not isinstance(self.tts, CachedTTS) or self.audio_player.is_playing:
+            return False
+        phrase = random.choice(self.filler_phrases)
+        audio = self.tts.cached(phrase)
+        if audio is None:
+            return False
+        print(f"[i] Filler: {phrase}")
+        self.audio_player.begin(self.tts.sample_rate)
+        self.audio_player.enqueue(audio)
+        self.audio_player.end()
+        return True
+
+    async def _generate(self, speech: SpeechPipeline, messages: List[Dict[str, str]], route: str) -> str:
+        # Keeps new low-priority background LLM work from starting while the user waits
+        async with self.background.foreground():
+            return await speech.run(self.router.astream_chat(route, messages))
+
+    async def _call_tool(self, server_name: Optional[str], tool_name: str, args: Dict[str, Any]) -> str:
+        if not server_name:
+            return "Error: Server name missing."
+        try:
+            result = await self.mcp_client.call_tool(server_name, tool_name, args)
+            return str(result)
+        except Exception as e:
+            print(f"[!] Tool execution failed: {e}")
+            return f"Error: Tool execution failed: {e}"
+
+    def _remember_turn(self, user_text: str, reply: str):
+        self.memory_manager.add_interaction("user", user_text)
+        self.memory_manager.add_interaction("assistant", reply)
+
+    def _schedule_consolidation(self):
+        if self.consolidator.due() and self.consolidator.claim():
+            if not self.background.submit(self._consolidate_knowledge, name="knowledge consolidation",
+                                          priority=BackgroundTaskQueue.LOW):
+                self.consolidator.release()
+
+    def _consolidate_knowledge(self):
+        """Extract knowledge from the pending turns with one LLM call."""
+        print(f"[State] EXTRACTING KNOWLEDGE ({self.consolidator.pending} turns)...")
+        self.consolidator.consolidate()
+
+    def _on_knowledge_update(self, knowledge: Dict[str, Any]):
+        # Broadcast knowledge update to frontend
+        profile = self.memory_manager.user_profile.get_profile()
+        self._emit_status("knowledge_update", {
+            "profile": profile,
+            "latest_extraction": knowledge
+        })
+        print(f"[Knowledge] Updated: {knowledge}")
+
+    def _start_barge_in_monitor(self):
+        if self._barge_in_task is None or self._barge_in_task.done():
+            self._barge_in_task = asyncio.ensure_future(asyncio.to_thread(self._monitor_barge_in))
+
+    def _speak(self, text: str) -> threading.Thread:
+        """
+        Start speaking `text` without waiting for the whole reply to be synthesized.
+
+        Sentences are synthesized in a background thread and queued on the player as
+        each one completes; synthesis stops as soon as playback is interrupted.
+        """
+        self.audio_player.begin(self.tts.sample_rate)
+
+        def synthesize():
+            started = time.time()
+            first_chunk = True
+            try:
+                with closing(self.tts.synthesize_stream(text)) as chunks:
+                    for chunk in chunks:
+                        if not self.audio_player.is_playing:
+                            break  # Interrupted (barge-in or shutdown)
+                        if first_chunk:
+                            print(f"[Piper] First audio after {(time.time() - started) * 1000:.0f} ms")
+                            first_chunk = False
+                        self.audio_player.enqueue(chunk)
+            except Exception as e:
+                print(f"[x] TTS Error: {e}")
+            finally:
+                self.audio_player.end()
+
+        thread = threading.Thread(target=synthesize, daemon=True)
+        thread.start()
+        return thread
+
+    def _monitor_barge_in(self) -> Optional[np.ndarray]:
+        """
+        Watch the microphone bus while the reply plays.
+
+        Returns the int16 samples of the interrupting utterance if the user barged
+        in, or None if playback finished (or shutdown was requested).
+        """
+        subscription = self.mic_bus.subscribe()
+        self.speech_detector.start(subscription)
+        interrupted = False
+        try:
+            # Wait while playing OR speech detected OR shutdown
+            while self.audio_player.is_playing:
+                if self.shutdown_event.is_set():
+                    self.audio_player.stop()
+                    break
+                    
+                if self.speech_detector.wait_for_speech(timeout=0.1):
+                    print("[!] Barge-In Detected! Stopping TTS.")
+                    self.audio_player.stop()
+                    interrupted = True
+                    break
+        finally:
+            self.speech_detector.stop()
+
+        if not interrupted:
+            subscription.close()
+            return None
+
+        # Get buffered audio (start of utterance), then keep reading the same
+        # subscription until silence so nothing between the two is lost
+        recorder = PcmRecorder(self.mic_bus.sample_rate, self.config.recording_max_sec)
+        for frame in self.speech_detector.get_buffer():
+            recorder.append(frame)
+        print("Listening to interruption...")
+        self.endpointer.reset()
+        for frame in self.speech_detector.get_buffer():
+            self.endpointer.process(frame)
+        
+        while not self.shutdown_event.is_set() and self.endpointer.endpoint_sec is None:
+            chunk = subscription.read(timeout=0.1)
+            if chunk is None:
+                if subscription.exhausted:
+                    break
+                continue
+            recorder.append(chunk)
+            
+            if self.endpointer.process(chunk):
+                print(f"[i] Endpoint detected ({self.endpointer.reason}).")
+
+        subscription.close()
+        return recorder.view()
@@ -0,0 +1,95 @@
+from typing import Optional
+
+import numpy as np
+
+from .endpointing import Endpointer
+
+
+class SpeechTrimmer:
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 pad_sec: float = 0.25,
+                 block_size: int = 1280,
+                 **endpointing):
+        """
+        Cuts non-speech off an utterance before it is sent to Whisper.
+
+        Recordings carry the pre-speech gap after the wake word and the endpoint
+        hangover; Whisper spends decode time on both and sometimes hallucinates
+        text in them. The speech span comes from the Endpointer that recorded the
+        utterance (VAD + noise floor per 80 ms block), or from a separate pass with
+        the same classifier. Utterances without speech are dropped entirely.
+
+        Args:
+            sample_rate: Sample rate of the recordings.
+            pad_sec: Audio kept on either side of the speech span.
+            block_size: Block size for the standalone VAD pass.
+            **endpointing: Extra Endpointer settings (vad_threshold, snr_margin_db, ...).
+        """
+        self.sample_rate = sample_rate
+        self.pad_sec = pad_sec
+        self.block_size = block_size
+        # The hangover/timeout settings of the live endpointer don't apply here
+        self._endpointing = {k: v for k, v in endpointing.items()
+                             if k not in ("hangover_sec", "max_silence_sec", "no_speech_timeout_sec")}
+        self._endpointer: Optional[Endpointer] = None
+        self.turns = 0
+        self.dropped = 0
+        self.audio_sec = 0.0
+        self.saved_sec = 0.0
+        self.last_saved_sec = 0.0
+        # Samples cut off the front of the last trimmed utterance
+        self.last_offset = 0
+
+    def speech_bounds(self, audio: np.ndarray) -> Optional[tuple[float, float]]:
+        """Run the speech classifier over a whole buffer and return (start, end) in seconds."""
+        if self._endpointer is None:
+            # Never endpoint: we only want the speech span
+            self._endpointer = Endpointer(
+                sample_rate=self.sample_rate,
+                hangover_sec=float("inf"),
+                max_silence_sec=float("inf"),
+                no_speech_timeout_sec=None,
+                **self._endpointing
+            )
+        self._endpointer.reset()
+        for start in range(0, len(audio) - self.block_size + 1, self.block_size):
+            self._endpointer.process(audio[start:start + self.block_size])
+        return self._endpointer.speech_bounds_sec
+
+    def trim(self,
+             audio: np.ndarray,
+             bounds: Optional[tuple[float, float]] = None) -> Optional[np.ndarray]:
+        """
+        Return the padded speech span of `audio` (a view), or None if there is no speech.
+
+        The number of samples cut off the front is kept in `last_offset`, so
+        positions into the untrimmed buffer (e.g. text streaming ASR has already
+        committed) can be mapped onto the trimmed one.
+
+        Args:
+            audio: int16 samples of the utterance.
+            bounds: Speech span in seconds from the recording's Endpointer; computed if None.
+        """
+        total_sec = len(audio) / self.sample_rate
+        self.turns += 1
+        self.audio_sec += total_sec
+        if bounds is None:
+            bounds = self.speech_bounds(audio)
+        if bounds is None:
+            self.dropped += 1
+            self.last_saved_sec = total_sec
+            self.saved_sec += total_sec
+            self.last_offset = 0
+            print(f"[i] No speech in {total_sec:.1f}s of audio; skipping transcription.")
+            return None
+
+        start = max(0, int((bounds[0] - self.pad_sec) * self.sample_rate))
+        end = min(len(audio), int((bounds[1] + self.pad_sec) * self.sample_rate))
+        trimmed = audio[start:end]
+        self.last_offset = start
+        self.last_saved_sec = total_sec - len(trimmed) / self.sample_rate
+        self.saved_sec += self.last_saved_sec
+        if self.last_saved_sec > 0:
+            print(f"[i] Trimmed {self.last_saved_sec:.2f}s of non-speech ({len(trimmed) / self.sample_rate:.2f}s left).")
+        return trimmed
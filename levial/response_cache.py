@@ -0,0 +1,281 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9']+")
+# Answers to these change with the clock
+_TIME = re.compile(r"\b(time|date|day|today|tonight|tomorrow|clock|hour|minute)\b", re.IGNORECASE)
+# Follow-ups that only make sense with the preceding turns
+_DEPENDENT = re.compile(r"\b(that|those|them|he|she|him|her|again|else)\b", re.IGNORECASE)
+
+_CONTRACTIONS = {"'s": " is", "'re": " are", "'m": " am", "'ll": " will", "'ve": " have", "n't": " not"}
+
+# (raw LLM output, server, tool, arguments) for one tool call of the agentic loop
+ToolStep = Tuple[str, str, str, Dict[str, Any]]
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("\u2019", "'")
+    for short, full in _CONTRACTIONS.items():
+        text = text.replace(short, full)
+    return " ".join(_WORD.findall(text))
+
+
+def _anchors(transcript: str, tool_steps: List[ToolStep]) -> frozenset:
+    """
+    Words a matching request must repeat: numbers, and words of the request
+    that were passed to a tool (an airport code, a city). Embeddings rate
+    "METAR at EDDF" and "METAR at EDDM" as near-identical.
+    """
+    words = set(_normalize(transcript).split())
+    arguments = set()
+    for _, _, _, args in tool_steps:
+        for value in (args or {}).values():
+            if isinstance(value, (str, int, float)):
+                arguments.update(_normalize(str(value)).split())
+    return frozenset(w for w in words if any(c.isdigit() for c in w) or w in arguments)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable short hash of JSON-serializable inputs (profile, tool catalog, tool outputs, ...)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CachedResponse:
+    def __init__(self,
+                 transcript: str,
+                 reply: str,
+                 category: str,
+                 context_key: str,
+                 vector: np.ndarray,
+                 expires_at: float,
+                 tool_steps: Optional[List[ToolStep]] = None,
+                 tool_hash: str = ""):
+        self.transcript = transcript
+        self.reply = reply
+        self.category = category
+        self.context_key = context_key
+        self.vector = vector
+        self.expires_at = expires_at
+        self.tool_steps = tool_steps or []
+        self.tool_hash = tool_hash
+        self.anchors = _anchors(transcript, self.tool_steps)
+        self.hits = 0
+
+    @property
+    def llm_calls(self) -> int:
+        # One call per tool step plus the final answer
+        return len(self.tool_steps) + 1
+
+
+class ResponseCache:
+    def __init__(self,
+                 threshold: float = 0.92,
+                 ttl_sec: Optional[Dict[str, float]] = None,
+                 max_entries: int = 256,
+                 embedding: str = "default",
+                 hash_dim: int = 1024):
+        """
+        Semantic cache of final replies to user requests.
+
+        A request is looked up by the embedding of its transcript: the closest
+        live entry with cosine similarity >= `threshold` and the same context key
+        (model, profile version, tool catalog; plus the current minute for
+        clock questions) is returned. Entries from a loop that called tools keep
+        those calls and a hash of their outputs, so the caller can re-run the
+        tools (no LLM call) and only reuse the reply if the outputs are unchanged.
+
+        Entries expire per category ("time", "tool", "chat"; TTL 0 disables
+        caching for a category) and the least recently used entry is evicted
+        beyond `max_entries`. Follow-ups that refer back to earlier turns
+        ("what about that?") are never cached.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit.
+            ttl_sec: Seconds an entry stays valid, per category.
+            max_entries: Entries kept before LRU eviction.
+            embedding: "default" uses ChromaDB's default embedding function (the
+                model the memory store already uses); "lexical" or an unavailable
+                model falls back to hashed word/bigram vectors.
+            hash_dim: Dimension of the lexical fallback vectors.
+        """
+        self.threshold = threshold
+        self.ttl_sec = {"time": 60, "tool": 300, "chat": 3600}
+        self.ttl_sec.update(ttl_sec or {})
+        self.max_entries = max_entries
+        self.hash_dim = hash_dim
+        self._entries: "OrderedDict[int, CachedResponse]" = OrderedDict()
+        self._ids = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.llm_calls_saved = 0
+
+        self._embed = None
+        if embedding == "default":
+            try:
+                from chromadb.utils import embedding_functions
+                self._embed = embedding_functions.DefaultEmbeddingFunction()
+            except Exception as e:
+                logger.warning(f"Embedding model unavailable, using lexical response cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def category(transcript: str, tool_steps: Optional[List[ToolStep]] = None) -> str:
+        if _TIME.search(transcript):
+            return "time"
+        return "tool" if tool_steps else "chat"
+
+    @staticmethod
+    def cacheable(transcript: str) -> bool:
+        # "System: ..." transcripts are internal prompts (proactive openers), not user requests
+        if transcript.lstrip().lower().startswith("system:"):
+            return False
+        return bool(_WORD.search(transcript.lower())) and not _DEPENDENT.search(transcript)
+
+    def context_key(self, transcript: str, *volatile: Any) -> str:
+        """Key of the inputs besides the transcript that the reply depends on."""
+        if self.category(transcript) == "time":
+            # Only reuse clock answers within the same minute
+            volatile = volatile + (int(time.time() // 60),)
+        return fingerprint(*volatile)
+
+    def embed(self, text: str) -> np.ndarray:
+        text = _normalize(text)
+        if self._embed is not None:
+            vector = np.asarray(self._embed([text])[0], dtype=np.float32)
+        else:
+            words = text.split()
+            vector = np.zeros(self.hash_dim, dtype=np.float32)
+            for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                vector[int.from_bytes(digest[:4], "little") % self.hash_dim] += 1.0
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _expire(self, now: float) -> None:
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[key]
+            self.expirations += 1
+
+    def lookup(self, transcript: str, context_key: str) -> Tuple[Optional[CachedResponse], Optional[np.ndarray]]:
+        """
+        Closest live entry for `transcript`, or None.
+
+        Also returns the transcript's embedding so store() doesn't compute it
+        again. A returned entry with tool_steps still has to be validated with
+        validate() before its reply is used.
+        """
+        if not self.cacheable(transcript):
+            return None, None
+        vector = self.embed(transcript)
+        words = set(_normalize(transcript).split())
+        numbers = {w for w in words if any(c.isdigit() for c in w)}
+        with self._lock:
+            self._expire(time.time())
+            best, best_score = None, self.threshold
+            for key, entry in self._entries.items():
+                if entry.context_key != context_key or not entry.anchors <= words:
+                    continue
+                if numbers != {w for w in entry.anchors if any(c.isdigit() for c in w)}:
+                    continue
+                score = float(entry.vector @ vector) if entry.vector.shape == vector.shape else 0.0
+                if score >= best_score:
+                    best, best_score = key, score
+            if best is None:
+                self.misses += 1
+                return None, vector
+            self._entries.move_to_end(best)
+            entry = self._entries[best]
+        logger.info(f"Response cache candidate for '{transcript}': '{entry.transcript}' ({best_score:.2f})")
+        if not entry.tool_steps:
+            self._record_hit(entry)
+        return entry, vector
+
+    def validate(self, entry: CachedResponse, tool_outputs: List[str]) -> bool:
+        """Accept a tool-backed entry if re-running its tools gave the same outputs; drop it otherwise."""
+        if fingerprint(*tool_outputs) == entry.tool_hash:
+            self._record_hit(entry)
+            return True
+        with self._lock:
+            for key, candidate in list(self._entries.items()):
+                if candidate is entry:
+                    del self._entries[key]
+            self.stale += 1
+            self.misses += 1
+        return False
+
+    def _record_hit(self, entry: CachedResponse) -> None:
+        with self._lock:
+            entry.hits += 1
+            self.hits += 1
+            # Tool steps are re-run without the LLM; only the LLM calls are saved
+            self.llm_calls_saved += entry.llm_calls
+
+    def store(self,
+              transcript: str,
+              reply: str,
+              context_key: str,
+              tool_steps: Optional[List[ToolStep]] = None,
+              tool_outputs: Optional[List[str]] = None,
+              vector: Optional[np.ndarray] = None) -> bool:
+        """Cache the final reply of a request. Returns False if it is not cacheable."""
+        tool_steps = tool_steps or []
+        category = self.category(transcript, tool_steps)
+        ttl = self.ttl_sec.get(category, 0)
+        if not ttl or not reply.strip() or not self.cacheable(transcript):
+            return False
+        if vector is None:
+            vector = self.embed(transcript)
+        entry = CachedResponse(
+            transcript=transcript,
+            reply=reply,
+            category=category,
+            context_key=context_key,
+            vector=vector,
+            expires_at=time.time() + ttl,
+            tool_steps=list(tool_steps),
+            tool_hash=fingerprint(*(tool_outputs or [])),
+        )
+        with self._lock:
+            self._ids += 1
+            self._entries[self._ids] = entry
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "llm_calls_saved": self.llm_calls_saved,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
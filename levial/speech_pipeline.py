@@ -0,0 +1,182 @@
+import asyncio
+import json
+import queue
+import re
+import threading
+import time
+from contextlib import closing
+from typing import AsyncIterator, Callable, Optional
+
+from .audio import AudioPlayer
+from .tts import SentenceSegmenter
+
+# A "{" that may still turn out to be the start of a JSON object
+_JSON_START = re.compile(r'\{\s*("|$)')
+
+
+def _is_tool_call(text: str) -> bool:
+    """Same test the orchestrator applies: a JSON object with "tool" and "arguments"."""
+    end = text.rfind("}")
+    if end == -1:
+        return False
+    try:
+        call = json.loads(text[:end + 1])
+    except ValueError:
+        return False
+    return isinstance(call, dict) and "tool" in call and "arguments" in call
+
+
+class SpeechPipeline:
+    def __init__(self,
+                 tts,
+                 player: AudioPlayer,
+                 on_start: Optional[Callable[[], None]] = None,
+                 wait_for_playback_sec: float = 10.0):
+        """
+        Speaks an LLM reply while it is still being generated.
+
+        Tokens are cut into sentences as they arrive; each completed sentence is
+        handed to a synthesis thread that streams its audio into the player, so
+        the first sentence plays while the rest of the reply is generated.
+
+        If the first non-whitespace character of the reply is "{", the output is
+        treated as a tool call and nothing is spoken. Text from a "{" later in a
+        reply is held back: it is dropped if the rest of the reply is a tool call,
+        and spoken otherwise (as soon as it can't be JSON, e.g. "the set {a, b}",
+        or at the end of the reply), so tool-call JSON never reaches the speaker.
+
+        Playback that stops early is a barge-in (or shutdown): generation stops
+        and `interrupted` is set. If synthesis fails instead, `tts_failed` is set
+        and the rest of the reply is still generated (silently), so the caller
+        gets the full text.
+
+        Args:
+            tts: Piper backend (anything with synthesize_stream and sample_rate).
+            player: Player the audio is streamed into.
+            on_start: Called on the event loop right after playback begins
+                (e.g. to start barge-in monitoring).
+            wait_for_playback_sec: How long to let audio that is already playing
+                (a filler, an earlier turn) finish before starting.
+        """
+        self.tts = tts
+        self.player = player
+        self.on_start = on_start
+        self.wait_for_playback_sec = wait_for_playback_sec
+        self.text = ""
+        self.is_tool_call = False
+        self.started = False
+        self.interrupted = False
+        self.tts_failed = False
+        self.sentences = 0
+        self._segmenter = SentenceSegmenter()
+        # Text from a "{" that might start a tool call, not spoken yet
+        self._held: Optional[str] = None
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.time()
+
+    async def run(self, tokens: AsyncIterator[str]) -> str:
+        """Consume the token stream and return the full reply text."""
+        self._started_at = time.time()
+        decided = False
+        try:
+            async for token in tokens:
+                self.text += token
+                if not decided:
+                    stripped = self.text.lstrip()
+                    if not stripped:
+                        continue
+                    decided = True
+                    self.is_tool_call = stripped.startswith("{")
+                    token = self.text
+                if self.is_tool_call:
+                    continue
+
+                if self.tts_failed:
+                    continue
+                if self.started and not self.player.is_playing:
+                    # Barge-in (or shutdown) stopped playback: stop generating too
+                    self.interrupted = True
+                    break
+
+                await self._consume(token)
+
+            if not self.is_tool_call and not self.interrupted and not self.tts_failed:
+                while self._held is not None:
+                    held, self._held = self._held, None
+                    if _is_tool_call(held):
+                        break
+                    # Not a tool call after all: speak it, holding back at any later "{"
+                    await self._speak(self._segmenter.feed(held[0]))
+                    await self._consume(held[1:])
+                await self._speak(self._segmenter.flush())
+        finally:
+            if hasattr(tokens, "aclose"):
+                # Stops generation if we left the stream early
+                await tokens.aclose()
+            if self._thread is not None:
+                self._queue.put(None)
+        return self.text.strip()
+
+    async def _consume(self, text: str) -> None:
+        while text:
+            if self._held is not None:
+                self._held += text
+                text = ""
+                if not _JSON_START.match(self._held):
+                    # Can't be JSON ("{a, b}"): speak the "{" and rescan the rest
+                    released, self._held = self._held, None
+                    await self._speak(self._segmenter.feed(released[0]))
+                    text = released[1:]
+                continue
+            index = text.find("{")
+            if index == -1:
+                await self._speak(self._segmenter.feed(text))
+                return
+            await self._speak(self._segmenter.feed(text[:index]))
+            self._held = ""
+            text = text[index:]
+
+    async def _speak(self, sentences) -> None:
+        sentences = [s for s in sentences if s.strip()]
+        if not sentences:
+            return
+        if not self.started:
+            if self.player.is_playing:
+                await asyncio.to_thread(self.player.wait, self.wait_for_playback_sec)
+            self.player.begin(self.tts.sample_rate)
+            self.started = True
+            self._thread = threading.Thread(target=self._synthesize, daemon=True)
+            self._thread.start()
+            if self.on_start:
+                self.on_start()
+        for sentence in sentences:
+            self.sentences += 1
+            self._queue.put(sentence)
+
+    def _synthesize(self) -> None:
+        first_chunk = True
+        try:
+            while True:
+                sentence = self._queue.get()
+                if sentence is None or not self.player.is_playing:
+                    break
+                with closing(self.tts.synthesize_stream(sentence)) as chunks:
+                    for chunk in chunks:
+                        if not self.player.is_playing:
+                            return  # Interrupted (barge-in or shutdown)
+                        if first_chunk:
+                            print(f"[Piper] First audio {(time.time() - self._started_at) * 1000:.0f} ms after the request")
+                            first_chunk = False
+                        self.player.enqueue(chunk)
+        except Exception as e:
+            # Set before end() so run() doesn't take the end of playback for a barge-in
+            self.tts_failed = True
+            print(f"[x] TTS Error: {e}")
+        finally:
+            self.player.end()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued sentence has been synthesized."""
+        if self._thread is not None:
+            self._thread.join(timeout)
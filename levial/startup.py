@@ -0,0 +1,78 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class StartupTimeline:
+    def __init__(self):
+        """
+        Loads and warms engines concurrently and records when each one was ready.
+
+        Every step is a callable; blocking ones run in worker threads and
+        coroutine functions on the event loop, so model loads that release the
+        GIL (ONNX, whisper-server, Ollama) overlap. The timeline reports
+        per-step start/end offsets, wall time and the time the same steps
+        would have taken one after another.
+        """
+        self.started_at = time.time()
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    async def _run(self, name: str, fn: Callable[[], Any]) -> Any:
+        step = {"start_sec": time.time() - self.started_at, "ok": False}
+        self.steps[name] = step
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = await fn()
+            else:
+                result = await asyncio.to_thread(fn)
+            # Steps report "nothing to warm" / fallbacks as False
+            step["ok"] = result is not False
+            return result
+        except Exception as e:
+            step["error"] = str(e)
+            raise
+        finally:
+            step["end_sec"] = time.time() - self.started_at
+
+    async def gather(self, steps: Dict[str, Callable[[], Any]], required: Iterable[str] = ()) -> None:
+        """
+        Run `steps` concurrently and wait for all of them.
+
+        A failing step is reported and otherwise ignored, except for `required`
+        ones: their first error is raised once every step has finished.
+        """
+        required = set(required)
+        results = await asyncio.gather(*(self._run(name, fn) for name, fn in steps.items()), return_exceptions=True)
+        error: Optional[BaseException] = None
+        for name, result in zip(steps, results):
+            if isinstance(result, BaseException):
+                print(f"[{'x' if name in required else '!'}] Startup step '{name}' failed: {result}")
+                if name in required and error is None:
+                    error = result
+        if error is not None:
+            raise error
+
+    @property
+    def wall_sec(self) -> float:
+        return max((step["end_sec"] for step in self.steps.values()), default=0.0)
+
+    @property
+    def serial_sec(self) -> float:
+        return sum(step["end_sec"] - step["start_sec"] for step in self.steps.values())
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Steps ordered by completion, with start/end offsets in seconds."""
+        return [
+            dict(step, name=name, duration_sec=step["end_sec"] - step["start_sec"])
+            for name, step in sorted(self.steps.items(), key=lambda item: item[1]["end_sec"])
+        ]
+
+    def print(self, width: int = 30) -> None:
+        scale = width / self.wall_sec if self.wall_sec else 0.0
+        print(f"[i] Startup timeline ({self.wall_sec:.1f}s wall, {self.serial_sec:.1f}s if run one after another):")
+        for step in self.report():
+            begin = int(step["start_sec"] * scale)
+            bar = " " * begin + "#" * max(1, int(step["end_sec"] * scale) - begin)
+            status = "" if step["ok"] else ("  failed" if "error" in step else "  skipped")
+            print(f"    {step['name']:<16} |{bar:<{width}}| {step['start_sec']:5.1f}s → {step['end_sec']:5.1f}s{status}")
@@ -0,0 +1,149 @@
+import json
+import logging
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .history import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# Function words carry no signal about which tool fits and inflate lexical scores
+_STOPWORDS = frozenset(
+    "a an the and or but if of at to in on for from by with about as into is are was were be been "
+    "do does did can could will would should may might i me my you your we our it its this that these "
+    "those there here what whats which who how when where why please tell show give get".split()
+)
+
+
+def _words(text: str) -> List[str]:
+    # Split snake_case / camelCase tool names into words too
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text).replace("_", " ").replace("'", "")
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+class ToolIndex:
+    def __init__(self, tools: List[Dict[str, Any]], top_k: int = 5, embedding: str = "default", max_description_chars: int = 160):
+        """
+        Per-utterance tool selection for the prompt.
+
+        Built once when the tool list changes: every tool gets a compact one-line
+        rendering (name, server, shortened description, argument names and types)
+        and an embedding of its name and description. For each request only the
+        `top_k` tools closest to the utterance are rendered into the prompt instead
+        of the full JSON schema of every tool on every server.
+
+        Args:
+            tools: Tool dicts as aggregated by MCPClient.refresh_tools.
+            top_k: Tools included per request.
+            embedding: "default" uses ChromaDB's default embedding function (the model
+                the memory store already uses); "lexical" or an unavailable model falls
+                back to TF-IDF over tool names and descriptions.
+            max_description_chars: Descriptions are cut to this length in renderings.
+        """
+        self.tools = tools
+        self.top_k = top_k
+        self.max_description_chars = max_description_chars
+        self.renderings = [self._render(tool) for tool in tools]
+        self.full_tokens = estimate_tokens(json.dumps(tools, indent=2)) if tools else 0
+        self.selections = 0
+        self.tokens_saved = 0
+        self.last_selected: List[str] = []
+        self._last_query: Optional[str] = None
+        self._last_scores: List[float] = []
+
+        documents = [self._document(tool) for tool in tools]
+        self._embed = None
+        self._vectors: Optional[np.ndarray] = None
+        if embedding == "default" and tools:
+            try:
+                from chromadb.utils import embedding_functions
+                self._embed = embedding_functions.DefaultEmbeddingFunction()
+                self._vectors = self._normalize(np.asarray(self._embed(documents), dtype=np.float32))
+            except Exception as e:
+                logger.warning(f"Embedding model unavailable, using lexical tool retrieval: {e}")
+                self._embed = None
+        if self._vectors is None:
+            self._build_lexical(documents)
+
+    def _render(self, tool: Dict[str, Any]) -> str:
+        description = " ".join((tool.get("description") or "").split())
+        if len(description) > self.max_description_chars:
+            description = description[:self.max_description_chars].rsplit(" ", 1)[0] + "…"
+        schema = tool.get("inputSchema") or {}
+        required = set(schema.get("required", []))
+        arguments = {
+            name: prop.get("type", "any") + ("" if name in required else "?")
+            for name, prop in (schema.get("properties") or {}).items()
+        }
+        return json.dumps({
+            "server": tool.get("server"),
+            "tool": tool.get("name"),
+            "description": description,
+            "arguments": arguments,
+        }, ensure_ascii=False)
+
+    @staticmethod
+    def _document(tool: Dict[str, Any]) -> str:
+        params = " ".join((tool.get("inputSchema") or {}).get("properties", {}).keys())
+        return f"{tool.get('name', '')} ({tool.get('server', '')}): {tool.get('description') or ''} {params}"
+
+    @property
+    def lexical(self) -> bool:
+        """True if tools are ranked by TF-IDF rather than embeddings (scores are not comparable)."""
+        return self._vectors is None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-9)
+
+    def _build_lexical(self, documents: List[str]) -> None:
+        counts = [Counter(_words(doc)) for doc in documents]
+        df = Counter(word for count in counts for word in count)
+        n = max(len(documents), 1)
+        self._idf = {word: math.log((1 + n) / (1 + freq)) + 1 for word, freq in df.items()}
+        self._lexical = [self._tfidf(count) for count in counts]
+
+    def _tfidf(self, count: Counter) -> Dict[str, float]:
+        vector = {word: tf * self._idf.get(word, 0.0) for word, tf in count.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {word: v / norm for word, v in vector.items()}
+
+    def scores(self, query: str) -> List[float]:
+        # Tool selection and request routing score the same utterance
+        if query == self._last_query:
+            return self._last_scores
+        if self._vectors is not None:
+            query_vector = self._normalize(np.asarray(self._embed([query]), dtype=np.float32))[0]
+            scores = (self._vectors @ query_vector).tolist()
+        else:
+            query_vector = self._tfidf(Counter(_words(query)))
+            scores = [sum(weight * doc.get(word, 0.0) for word, weight in query_vector.items()) for doc in self._lexical]
+        self._last_query, self._last_scores = query, scores
+        return scores
+
+    def select(self, query: str, k: Optional[int] = None) -> List[int]:
+        """Indices of the `k` tools most relevant to `query`, best first."""
+        k = self.top_k if k is None else k
+        if len(self.tools) <= k:
+            return list(range(len(self.tools)))
+        scores = self.scores(query)
+        return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+
+    def prompt(self, query: str, k: Optional[int] = None) -> str:
+        """Compact renderings of the tools selected for `query`, one per line."""
+        if not self.tools:
+            return ""
+        selected = self.select(query, k)
+        text = "\n".join(self.renderings[i] for i in selected)
+        self.selections += 1
+        self.tokens_saved += self.full_tokens - estimate_tokens(text)
+        self.last_selected = [self.tools[i].get("name") for i in selected]
+        return text
@@ -1,11 +1,89 @@
+import json
+import re
 import subprocess
+import threading
 import time
+import wave
+from collections import OrderedDict
 from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+
+# Sentence end: . ! ? (optionally followed by quotes/brackets) and whitespace.
+# Abbreviations and decimals like "Dr. Smith" or "3.5" are not split.
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "approx."}
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences for incremental synthesis."""
+    sentences: List[str] = []
+    current = ""
+    pos = 0
+    for match in _SENTENCE_END.finditer(text):
+        current += text[pos:match.start()]
+        pos = match.end()
+        last_word = current.rsplit(None, 1)[-1].lower() if current.strip() else ""
+        if last_word in _ABBREVIATIONS:
+            current += " "
+            continue
+        if current.strip():
+            sentences.append(current.strip())
+        current = ""
+    current += text[pos:]
+    if current.strip():
+        sentences.append(current.strip())
+    return sentences
+
+
+class SentenceSegmenter:
+    """
+    Incremental split_sentences for streamed text.
+
+    feed() returns the sentences completed by the new text. A sentence only
+    counts as complete once the whitespace after its final punctuation has
+    arrived, so "Dr." or "3." at the end of a chunk is not cut prematurely.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        sentences = split_sentences(self.buffer)
+        if len(sentences) < 2:
+            return []
+        # The last piece may still be growing
+        self.buffer = sentences[-1]
+        return sentences[:-1]
+
+    def flush(self) -> List[str]:
+        sentences = split_sentences(self.buffer)
+        self.buffer = ""
+        return sentences
+
 
 class PiperTTS:
     def __init__(self, model_path: Path, base_dir: Path):
         self.model_path = model_path
         self.base_dir = base_dir
+        self.sample_rate = self._read_sample_rate()
+
+    def start(self) -> bool:
+        """The piper CLI loads the voice per call; nothing to warm up."""
+        return True
+
+    def warm(self) -> bool:
+        """Run a dummy synthesis so the first reply is fast. Nothing is resident for the CLI."""
+        return False
+
+    def _read_sample_rate(self) -> int:
+        config_path = Path(f"{self.model_path}.json")
+        try:
+            return json.loads(config_path.read_text())["audio"]["sample_rate"]
+        except Exception:
+            return 22050
 
     def synthesize(self, text: str, output_dir: Path) -> Path:
         output = output_dir / f"response_{int(time.time())}.wav"
@@ -20,3 +98,179 @@ class PiperTTS:
         subprocess.run(cmd, input=text, text=True, check=True, cwd=str(self.base_dir))
         print(f"[Piper] Saved audio to {output}")
         return output
+
+    def synthesize_stream(self, text: str, chunk_bytes: int = 4096) -> Iterator[np.ndarray]:
+        """
+        Synthesize sentence by sentence, yielding int16 PCM as soon as Piper produces it.
+
+        Piper reads one sentence per input line and writes raw audio for each line
+        as it finishes, so the first chunk arrives after the first sentence rather
+        than after the whole reply. Closing the generator early kills Piper.
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+
+        cmd = [
+            "piper",
+            "--model",
+            str(self.model_path),
+            "--output_raw",
+        ]
+        print(f"[…] Running Piper TTS ({len(sentences)} sentences, streaming)...")
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=str(self.base_dir),
+        )
+
+        def feed() -> None:
+            try:
+                for sentence in sentences:
+                    process.stdin.write((sentence.replace("\n", " ") + "\n").encode("utf-8"))
+                    process.stdin.flush()
+                process.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+        threading.Thread(target=feed, daemon=True).start()
+
+        try:
+            leftover = b""
+            while True:
+                data = process.stdout.read1(chunk_bytes)
+                if not data:
+                    break
+                data = leftover + data
+                usable = len(data) - len(data) % 2
+                leftover = data[usable:]
+                if usable:
+                    yield np.frombuffer(data[:usable], dtype=np.int16)
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, cmd)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+class PiperVoiceTTS(PiperTTS):
+    def __init__(self, model_path: Path, base_dir: Path, phoneme_cache_size: int = 512):
+        """
+        Piper running in-process through the piper-tts Python package.
+
+        The ONNX Runtime session and espeak are loaded once in start() instead of
+        per reply, audio comes back as int16 arrays without a WAV file or pipe in
+        between, and the phoneme IDs of recurring sentences (greetings, fillers,
+        confirmations) are kept in an LRU cache so espeak only runs on new text.
+        Falls back to the piper CLI if the package or voice cannot be loaded.
+
+        Args:
+            model_path: Piper .onnx voice (its .onnx.json config must sit next to it).
+            base_dir: Project base directory.
+            phoneme_cache_size: Sentences whose phoneme IDs are cached.
+        """
+        super().__init__(model_path, base_dir)
+        self.phoneme_cache_size = phoneme_cache_size
+        self.voice = None
+        self._phoneme_cache: "OrderedDict[str, List[List[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.voice is not None
+
+    def start(self) -> bool:
+        """Load the voice. Returns False (CLI fallback) if piper-tts is unavailable."""
+        if self.voice is not None:
+            return True
+        try:
+            from piper.voice import PiperVoice
+        except ImportError:
+            print("[!] piper-tts Python package not installed; using the piper CLI.")
+            return False
+        started = time.time()
+        try:
+            self.voice = PiperVoice.load(str(self.model_path))
+        except Exception as e:
+            print(f"[x] Could not load Piper voice {self.model_path.name}: {e}; using the piper CLI.")
+            return False
+        self.sample_rate = self.voice.config.sample_rate
+        print(f"[✓] Piper voice loaded in {time.time() - started:.1f}s")
+        return True
+
+    def warm(self) -> bool:
+        """Synthesize a short phrase: initializes espeak-ng and the ONNX session's buffers."""
+        if self.voice is None:
+            return False
+        started = time.time()
+        for _ in self.synthesize_stream("Hello."):
+            pass
+        print(f"[✓] Piper voice warm in {time.time() - started:.1f}s")
+        return True
+
+    def phoneme_ids(self, sentence: str) -> List[List[int]]:
+        """Phoneme IDs of `sentence` (one list per espeak sentence), cached."""
+        key = " ".join(sentence.split())
+        cached = self._phoneme_cache.get(key)
+        if cached is not None:
+            self._phoneme_cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+        ids = [self.voice.phonemes_to_ids(phonemes) for phonemes in self.voice.phonemize(key)]
+        self._phoneme_cache[key] = ids
+        if len(self._phoneme_cache) > self.phoneme_cache_size:
+            self._phoneme_cache.popitem(last=False)
+        return ids
+
+    def _ids_to_pcm(self, ids: List[int]) -> np.ndarray:
+        if hasattr(self.voice, "phoneme_ids_to_audio"):
+            # piper >= 1.3 returns float samples
+            audio = np.asarray(self.voice.phoneme_ids_to_audio(ids), dtype=np.float32).reshape(-1)
+            return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        return np.frombuffer(self.voice.synthesize_ids_to_raw(ids), dtype=np.int16)
+
+    def synthesize_pcm(self, text: str) -> np.ndarray:
+        """Synthesize `text` and return all of it as one int16 array."""
+        chunks = list(self.synthesize_stream(text))
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+
+    def synthesize(self, text: str, output_dir: Path) -> Path:
+        if self.voice is None:
+            return super().synthesize(text, output_dir)
+        output = output_dir / f"response_{int(time.time())}.wav"
+        with wave.open(str(output), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.synthesize_pcm(text).tobytes())
+        print(f"[Piper] Saved audio to {output}")
+        return output
+
+    def synthesize_stream(self, text: str, chunk_bytes: int = 4096) -> Iterator[np.ndarray]:
+        """Yield int16 PCM sentence by sentence from the resident voice."""
+        if self.voice is None:
+            yield from super().synthesize_stream(text, chunk_bytes)
+            return
+        for sentence in split_sentences(text):
+            with self._lock:
+                ids_list = self.phoneme_ids(sentence)
+            for ids in ids_list:
+                with self._lock:
+                    audio = self._ids_to_pcm(ids)
+                if len(audio):
+                    yield audio
+
+    def cache_stats(self) -> dict:
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / total if total else 0.0,
+            "size": len(self._phoneme_cache),
+        }
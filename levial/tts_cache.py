@@ -0,0 +1,190 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .tts import PiperTTS, split_sentences
+
+
+class TTSCache:
+    def __init__(self,
+                 cache_dir: Path,
+                 voice: str,
+                 params: Optional[Dict[str, Any]] = None,
+                 memory_bytes: int = 32 * 1024 * 1024,
+                 disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Content-addressed store of synthesized int16 PCM.
+
+        Entries are keyed by sha256 of (voice, normalized text, synthesis params),
+        so changing the voice or its settings never returns stale audio. Recently
+        used entries live in memory; everything is also written to `cache_dir` as
+        raw PCM. Both tiers are bounded and evict least recently used entries
+        first (disk recency is tracked through file mtimes, so it survives restarts).
+
+        Args:
+            cache_dir: Directory for the on-disk tier.
+            voice: Voice identifier, e.g. the Piper model file name.
+            params: Synthesis settings that change the audio (sample rate, speed, ...).
+            memory_bytes: Size bound of the in-memory tier.
+            disk_bytes: Size bound of the on-disk tier.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.voice = voice
+        self.params = params or {}
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size = sum(p.stat().st_size for p in self.cache_dir.glob("*.pcm"))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        payload = json.dumps({"voice": self.voice, "text": " ".join(text.split()), "params": self.params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pcm"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.key(text)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        path = self._path(key)
+        try:
+            audio = np.fromfile(path, dtype=np.int16)
+            path.touch()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def put(self, text: str, audio: np.ndarray) -> None:
+        if len(audio) == 0:
+            return
+        key = self.key(text)
+        audio = np.ascontiguousarray(audio, dtype=np.int16)
+        with self._lock:
+            self._remember(key, audio)
+        path = self._path(key)
+        if not path.exists():
+            tmp = path.with_suffix(".tmp")
+            audio.tofile(tmp)
+            tmp.replace(path)
+            with self._lock:
+                self._disk_size += audio.nbytes
+            self._evict_disk()
+
+    def _remember(self, key: str, audio: np.ndarray) -> None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_size += audio.nbytes
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= evicted.nbytes
+
+    def _evict_disk(self) -> None:
+        with self._lock:
+            if self._disk_size <= self.disk_bytes:
+                return
+            files = sorted(self.cache_dir.glob("*.pcm"), key=lambda p: p.stat().st_mtime)
+            for path in files:
+                if self._disk_size <= self.disk_bytes:
+                    break
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                    self._disk_size -= size
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size,
+        }
+
+
+class CachedTTS:
+    def __init__(self, tts: PiperTTS, cache: TTSCache):
+        """
+        Wraps a Piper backend so repeated phrases are served from a TTSCache.
+
+        With the in-process voice each sentence is cached on its own, so common
+        sentences inside longer replies ("Sure.", "Goodbye!") are hits too. With
+        the CLI backend whole replies are cached, to keep one piper process per
+        reply. Audio is only stored once a unit has been synthesized completely,
+        so an interrupted reply never leaves a truncated entry behind.
+        """
+        self.tts = tts
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.tts, name)
+
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.sample_rate
+
+    def _units(self, text: str) -> List[str]:
+        if getattr(self.tts, "loaded", False):
+            return split_sentences(text)
+        return [text] if text.strip() else []
+
+    def synthesize_stream(self, text: str, chunk_bytes: int = 4096) -> Iterator[np.ndarray]:
+        for unit in self._units(text):
+            cached = self.cache.get(unit)
+            if cached is not None:
+                yield cached
+                continue
+            chunks = []
+            for chunk in self.tts.synthesize_stream(unit, chunk_bytes):
+                chunks.append(chunk)
+                yield chunk
+            if chunks:
+                self.cache.put(unit, np.concatenate(chunks))
+
+    def cached(self, text: str) -> Optional[np.ndarray]:
+        """Audio for `text` if it is fully cached (no synthesis), else None."""
+        parts = []
+        for unit in self._units(text):
+            audio = self.cache.get(unit)
+            if audio is None:
+                return None
+            parts.append(audio)
+        return np.concatenate(parts) if parts else None
+
+    def prewarm(self, phrases: Iterable[str]) -> int:
+        """Synthesize `phrases` that are not cached yet. Returns how many were synthesized."""
+        synthesized = 0
+        for phrase in phrases:
+            if self.cached(phrase) is None:
+                for _ in self.synthesize_stream(phrase):
+                    pass
+                synthesized += 1
+        return synthesized
@@ -0,0 +1,127 @@
+"""
+Endpointing benchmark on recorded utterances.
+
+Streams each WAV file through the adaptive Endpointer and through the old
+fixed rule (RMS below 0.01 for `silence_duration`) in 80 ms blocks, and
+reports for each:
+
+- endpoint latency: time from the reference end of speech to the endpoint
+- premature-cut rate: share of utterances endpointed before speech ended
+
+The reference end of speech is the last block the VAD marks as speech when
+it sees the whole file, or comes from a labels JSON ({"file.wav": end_sec}).
+Recordings can be collected with `"persist_audio": true`.
+
+Usage:
+    python scripts/bench_endpointing.py data/artifacts/utterance_*.wav [--labels labels.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import wave
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from levial.audio import block_rms
+from levial.endpointing import Endpointer
+
+BLOCK_SIZE = 1280
+
+
+def load_wav(path: Path) -> tuple[np.ndarray, int]:
+    with wave.open(str(path), "rb") as wf:
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if wf.getnchannels() > 1:
+            audio = audio.reshape(-1, wf.getnchannels())[:, 0]
+        return audio.copy(), wf.getframerate()
+
+
+def blocks_of(audio: np.ndarray, trailing_silence_sec: float, sample_rate: int):
+    padded = np.concatenate([audio, np.zeros(int(trailing_silence_sec * sample_rate), dtype=np.int16)])
+    for start in range(0, len(padded) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        yield padded[start:start + BLOCK_SIZE]
+
+
+def reference_end(audio: np.ndarray, sample_rate: int, vad_threshold: float) -> Optional[float]:
+    """Offline end of speech: last VAD-positive block with full lookahead."""
+    from openwakeword.vad import VAD
+    vad = VAD()
+    end = None
+    for i, block in enumerate(blocks_of(audio, 0, sample_rate)):
+        score = vad(block)
+        if score is not None and score >= vad_threshold:
+            end = (i + 1) * BLOCK_SIZE / sample_rate
+    return end
+
+
+def legacy_endpoint(audio: np.ndarray, sample_rate: int, silence_duration: float, pad: float) -> Optional[float]:
+    elapsed = 0.0
+    last_sound = None
+    for block in blocks_of(audio, pad, sample_rate):
+        elapsed += BLOCK_SIZE / sample_rate
+        if block_rms(block) > 0.01:
+            last_sound = elapsed
+        if last_sound is not None and elapsed - last_sound > silence_duration:
+            return elapsed
+    return None
+
+
+def adaptive_endpoint(endpointer: Endpointer, audio: np.ndarray, sample_rate: int, pad: float) -> Optional[float]:
+    endpointer.reset()
+    for block in blocks_of(audio, pad, sample_rate):
+        if endpointer.process(block):
+            return endpointer.endpoint_sec if endpointer.reason == "end_of_speech" else None
+    return None
+
+
+def summarize(name: str, rows: list[tuple[float, Optional[float]]]):
+    latencies = [ep - ref for ref, ep in rows if ep is not None]
+    cuts = sum(1 for ref, ep in rows if ep is not None and ep < ref)
+    missed = sum(1 for _, ep in rows if ep is None)
+    if latencies:
+        print(f"{name:<10} median latency {statistics.median(latencies) * 1e3:7.0f} ms   "
+              f"p90 {sorted(latencies)[int(0.9 * (len(latencies) - 1))] * 1e3:7.0f} ms   "
+              f"premature cuts {cuts}/{len(rows)} ({100 * cuts / len(rows):.1f}%)   no endpoint {missed}")
+    else:
+        print(f"{name:<10} no endpoints declared ({missed} files)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--labels", type=Path, help="JSON mapping file name -> end of speech (sec)")
+    parser.add_argument("--silence-duration", type=float, default=1.5, help="Legacy silence timeout")
+    parser.add_argument("--pad", type=float, default=2.0, help="Trailing silence appended to each file (sec)")
+    parser.add_argument("--hangover", type=float, default=0.4)
+    parser.add_argument("--vad-threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    labels = json.loads(args.labels.read_text()) if args.labels else {}
+    endpointer = Endpointer(hangover_sec=args.hangover, vad_threshold=args.vad_threshold, no_speech_timeout_sec=None)
+
+    adaptive, legacy = [], []
+    for path in args.files:
+        audio, sample_rate = load_wav(path)
+        endpointer.sample_rate = sample_rate
+        ref = labels.get(path.name) or reference_end(audio, sample_rate, args.vad_threshold)
+        if ref is None:
+            print(f"[i] Skipping {path.name}: no speech found")
+            continue
+        adaptive.append((ref, adaptive_endpoint(endpointer, audio, sample_rate, args.pad)))
+        legacy.append((ref, legacy_endpoint(audio, sample_rate, args.silence_duration, args.pad)))
+
+    if not adaptive:
+        print("[!] No utterances with speech.")
+        return
+    print(f"{len(adaptive)} utterances")
+    summarize("adaptive", adaptive)
+    summarize("legacy", legacy)
+
+
+if __name__ == "__main__":
+    main()
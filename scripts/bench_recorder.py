@@ -0,0 +1,110 @@
+"""
+Micro-benchmark for the capture -> save hot path.
+
+Compares the old list-of-chunks recorder (append copies, then concatenate,
+clip and convert to int16 at the end) against PcmRecorder, which converts
+each block in place into a preallocated int16 buffer. Reports time spent
+appending, finalizing and writing the WAV, plus peak Python-tracked memory.
+
+Usage:
+    python scripts/bench_recorder.py [--seconds 30] [--dtype float32] [--runs 5]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from levial.audio import PcmRecorder
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1280
+
+
+def make_blocks(seconds: float, dtype: str) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    n_blocks = int(seconds * SAMPLE_RATE / BLOCK_SIZE)
+    if dtype == "int16":
+        return [rng.integers(-8000, 8000, size=(BLOCK_SIZE, 1), dtype=np.int16) for _ in range(n_blocks)]
+    return [rng.uniform(-0.3, 0.3, size=(BLOCK_SIZE, 1)).astype(np.float32) for _ in range(n_blocks)]
+
+
+def write_wav(path: Path, audio_int16: np.ndarray) -> None:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio_int16)
+
+
+def run_legacy(blocks: list[np.ndarray], path: Path) -> dict:
+    t0 = time.perf_counter()
+    frames = [block.copy() for block in blocks]
+    t1 = time.perf_counter()
+    audio = np.concatenate(frames, axis=0)
+    if audio.dtype != np.int16:
+        audio = np.clip(audio, -1.0, 1.0)
+        audio = (audio * 32767).astype(np.int16)
+    t2 = time.perf_counter()
+    write_wav(path, audio.tobytes())
+    t3 = time.perf_counter()
+    return {"append": t1 - t0, "finalize": t2 - t1, "save": t3 - t2}
+
+
+def run_recorder(blocks: list[np.ndarray], path: Path, max_sec: float) -> dict:
+    t0 = time.perf_counter()
+    recorder = PcmRecorder(SAMPLE_RATE, max_duration_sec=max_sec)
+    for block in blocks:
+        recorder.append(block)
+    t1 = time.perf_counter()
+    audio = recorder.view()
+    t2 = time.perf_counter()
+    write_wav(path, audio)
+    t3 = time.perf_counter()
+    return {"append": t1 - t0, "finalize": t2 - t1, "save": t3 - t2}
+
+
+def measure(fn, runs: int) -> tuple[dict, float]:
+    timings = []
+    peak = 0
+    for _ in range(runs):
+        tracemalloc.start()
+        timings.append(fn())
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    best = {key: min(t[key] for t in timings) for key in timings[0]}
+    return best, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0, help="Recording length (default: recording_max_sec)")
+    parser.add_argument("--dtype", choices=["float32", "int16"], default="float32")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    blocks = make_blocks(args.seconds, args.dtype)
+    print(f"{len(blocks)} blocks x {BLOCK_SIZE} samples ({args.seconds:.0f}s, {args.dtype})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.wav"
+        results = {
+            "list + concatenate": measure(lambda: run_legacy(blocks, path), args.runs),
+            "PcmRecorder": measure(lambda: run_recorder(blocks, path, args.seconds), args.runs),
+        }
+
+    print(f"{'recorder':<20}{'append ms':>12}{'finalize ms':>14}{'save ms':>10}{'total ms':>11}{'peak MB':>10}")
+    for name, (timing, peak_mb) in results.items():
+        total = sum(timing.values())
+        print(f"{name:<20}{timing['append'] * 1e3:>12.2f}{timing['finalize'] * 1e3:>14.2f}"
+              f"{timing['save'] * 1e3:>10.2f}{total * 1e3:>11.2f}{peak_mb:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
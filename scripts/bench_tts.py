@@ -0,0 +1,91 @@
+"""
+TTS benchmark: piper CLI vs. the in-process Piper voice.
+
+Synthesizes the same replies with both backends and reports, per backend,
+time to first audio, total synthesis time and real-time factor (synthesis
+time / audio duration, lower is better). The in-process voice is loaded once
+before the run; its load time and phoneme cache hit rate are reported
+separately. Replies are repeated `--rounds` times so the cache gets exercised
+the way recurring phrases do in conversation.
+
+Usage:
+    python scripts/bench_tts.py [--model models/piper/en_US-lessac-medium.onnx] [--rounds 3]
+"""
+import argparse
+import statistics
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from levial.tts import PiperTTS, PiperVoiceTTS
+
+REPLIES = [
+    "Sure, I can help with that.",
+    "It's currently 18 degrees and sunny in Berlin. Expect light clouds this afternoon.",
+    "I've added a reminder for your dentist appointment tomorrow at 9 a.m. Anything else?",
+    "Here's a quick summary. The meeting moved to Thursday, the budget was approved, and Sarah will send the slides.",
+    "Okay, stopping now.",
+]
+
+
+def run(tts: PiperTTS, texts: list[str]) -> dict:
+    first_audio, rtfs, total_audio, total_sec = [], [], 0.0, 0.0
+    for text in texts:
+        started = time.perf_counter()
+        first = None
+        samples = 0
+        with closing(tts.synthesize_stream(text)) as chunks:
+            for chunk in chunks:
+                if first is None:
+                    first = time.perf_counter() - started
+                samples += len(chunk)
+        elapsed = time.perf_counter() - started
+        audio_sec = samples / tts.sample_rate
+        if audio_sec:
+            first_audio.append(first)
+            rtfs.append(elapsed / audio_sec)
+        total_audio += audio_sec
+        total_sec += elapsed
+    return {
+        "first_audio_ms": statistics.median(first_audio) * 1e3 if first_audio else None,
+        "rtf": statistics.median(rtfs) if rtfs else None,
+        "total_sec": total_sec,
+        "audio_sec": total_audio,
+    }
+
+
+def report(name: str, result: dict):
+    if result["rtf"] is None:
+        print(f"{name:<10} produced no audio")
+        return
+    print(f"{name:<10} first audio {result['first_audio_ms']:6.0f} ms   RTF {result['rtf']:.3f}   "
+          f"{result['total_sec']:.1f}s for {result['audio_sec']:.1f}s of audio")
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=Path, default=base_dir / "models" / "piper" / "en_US-lessac-medium.onnx")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = REPLIES * args.rounds
+
+    voice = PiperVoiceTTS(args.model, base_dir)
+    started = time.perf_counter()
+    if not voice.start():
+        print("[x] In-process voice unavailable (pip install piper-tts).")
+        return
+    print(f"voice load {time.perf_counter() - started:.2f}s (once per process)")
+
+    report("cli", run(PiperTTS(args.model, base_dir), texts))
+    report("in-process", run(voice, texts))
+    stats = voice.cache_stats()
+    print(f"phoneme cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
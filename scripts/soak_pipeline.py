@@ -0,0 +1,107 @@
+"""
+Soak test / benchmark for the wake -> record -> endpoint path without a microphone.
+
+Builds a synthetic session from WAV clips (silence/noise, wake word, command,
+trailing silence, repeated N times), feeds it through the audio bus as fast
+as the pipeline can consume it, and runs the real WakeWordListener, recorder
+and Endpointer on it. Reports per-iteration wake detection, endpoint latency
+and overall speed relative to real time. Runs on a headless Linux box.
+
+Usage:
+    python scripts/soak_pipeline.py --wake hey_jarvis.wav --command command.wav --iterations 20
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from levial.audio import AudioCapture
+from levial.audio_bus import MicrophoneBus
+from levial.audio_sources import SequenceSource, SignalSource, WavFileSource
+from levial.endpointing import Endpointer
+from levial.wake_word import WakeWordListener
+
+SAMPLE_RATE = 16000
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wake", type=Path, required=True, help="WAV clip of the wake word")
+    parser.add_argument("--command", type=Path, required=True, help="WAV clip of a spoken command")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--gap", type=float, default=2.0, help="Seconds of background before each wake word")
+    parser.add_argument("--noise", type=float, default=0.0, help="Background noise amplitude (0 = silence)")
+    parser.add_argument("--realtime", action="store_true", help="Pace audio at 1x instead of as fast as possible")
+    parser.add_argument("--model", action="append", help="Wake word model path (default: hey_jarvis)")
+    args = parser.parse_args()
+
+    wake = WavFileSource(args.wake, SAMPLE_RATE)
+    command = WavFileSource(args.command, SAMPLE_RATE)
+    background = SignalSource("noise" if args.noise else "silence", args.gap, amplitude=args.noise, sample_rate=SAMPLE_RATE)
+    tail = SignalSource("silence", 2.0, sample_rate=SAMPLE_RATE)
+    parts = [background, wake, command, tail] * args.iterations
+    source = SequenceSource(parts, SAMPLE_RATE, realtime=args.realtime)
+    # Expected end of each command, in audio time
+    command_ends = [offset + command.duration_sec for offset in source.offsets_sec[2::4]]
+
+    bus = MicrophoneBus(sample_rate=SAMPLE_RATE, source=source)
+    capture = AudioCapture(SAMPLE_RATE, 1, max_duration_sec=30, bus=bus)
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE)
+
+    wake_event = threading.Event()
+    current = {}
+
+    def on_wake(model_name: str):
+        # Bus position right after the wake word, like the orchestrator records it
+        current["wake_position"] = current["subscription"].position
+        wake_event.set()
+
+    model_paths = args.model or [str(base_dir / "levial" / "models" / "hey_jarvis_v0.1.onnx")]
+    listener = WakeWordListener(callback=on_wake, model_paths=model_paths)
+
+    wakes, latencies, missed = 0, [], 0
+    start = time.perf_counter()
+    bus.start()
+    try:
+        while True:
+            wake_event.clear()
+            subscription = current["subscription"] = bus.subscribe()
+            listener.start(subscription)
+            while not wake_event.wait(timeout=0.05) and not subscription.exhausted:
+                pass
+            listener.stop()
+            subscription.close()
+            if not wake_event.is_set():
+                break
+            wakes += 1
+            wake_position = current["wake_position"]
+            wake_at = wake_position * bus.block_duration
+
+            audio = capture.record_until_silence(start_position=wake_position, endpointer=endpointer)
+            if audio is None or endpointer.endpoint_sec is None:
+                missed += 1
+                continue
+            endpoint_at = wake_position * bus.block_duration + endpointer.endpoint_sec
+            # The command that follows this wake word
+            expected = min((end for end in command_ends if end > wake_at), default=None)
+            if expected is not None:
+                latencies.append(endpoint_at - expected)
+    finally:
+        bus.stop()
+
+    wall = time.perf_counter() - start
+    audio_sec = len(source.samples()) / SAMPLE_RATE
+    print(f"{audio_sec:.1f}s of audio in {wall:.1f}s ({audio_sec / wall:.1f}x real time)")
+    print(f"wake words detected: {wakes}/{args.iterations}, recordings without endpoint: {missed}")
+    if latencies:
+        print(f"endpoint latency after command end: median {statistics.median(latencies) * 1e3:.0f} ms, "
+              f"max {max(latencies) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
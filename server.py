@@ -73,6 +73,7 @@ def status_callback(status: str, data: dict):
 # Run orchestrator in background thread
 orchestrator_thread = None
 orchestrator_running = False  # Track if orchestrator is actively running
+orchestrator_stopping = False  # Stop requested but the thread hasn't exited yet
 
 def run_orchestrator():
     """Run the orchestrator's async loop in a thread"""
@@ -82,8 +83,13 @@ def run_orchestrator():
     except Exception as e:
         logger.error(f"Orchestrator error: {e}")
     finally:
-        global orchestrator_running
+        global orchestrator_running, orchestrator_stopping
         orchestrator_running = False
+        if orchestrator_stopping:
+            # stop_agent gave up waiting; announce the stop now that the mic and ports are free
+            orchestrator_stopping = False
+            status_callback("agent_stopped", {})
+            logger.info("Agent stopped")
 
 @app.on_event("startup")
 async def startup_event():
@@ -105,12 +111,13 @@ async def get_status():
     """Return server and agent status"""
     return {
         "server_running": True,
-        "agent_running": orchestrator_running
+        "agent_running": orchestrator_running,
+        "agent_stopping": orchestrator_stopping
     }
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    global orchestrator, orchestrator_thread, orchestrator_running
+    global orchestrator, orchestrator_thread, orchestrator_running, orchestrator_stopping
     
     await manager.connect(websocket)
     logger.info("Client connected")
@@ -120,7 +127,7 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.send_json({"type": "connected", "message": "Connected to Levial Voice Agent"})
         
         # Send current user profile if orchestrator is running
-        if orchestrator:
+        if orchestrator and orchestrator.memory_manager:
             current_profile = orchestrator.memory_manager.user_profile.get_profile()
             await websocket.send_json({
                 "type": "knowledge_update",
@@ -140,7 +147,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if message.get("type") == "update_knowledge":
                     # Handle manual knowledge update
-                    if orchestrator is None:
+                    if orchestrator is None or orchestrator.memory_manager is None:
                         logger.warning("Orchestrator not running, cannot update knowledge")
                         continue
                         
@@ -181,7 +188,11 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                 elif message.get("type") == "start_agent":
                     # Handle agent start request
-                    if not orchestrator_running:
+                    if orchestrator_thread is not None and orchestrator_thread.is_alive() and not orchestrator_running:
+                        # The previous agent still holds the mic and the whisper-server ports
+                        logger.warning("Agent is still stopping; not starting a new one")
+                        await websocket.send_json({"type": "agent_stopping"})
+                    elif not orchestrator_running:
                         logger.info("Starting orchestrator...")
                         
                         # Create a new orchestrator instance
@@ -193,10 +204,8 @@ async def websocket_endpoint(websocket: WebSocket):
                         orchestrator_thread.start()
                         orchestrator_running = True
                         
-                        await manager.broadcast({
-                            "type": "agent_started"
-                        })
-                        logger.info("Agent started successfully")
+                        # The orchestrator announces agent_started once its models are warm
+                        logger.info("Agent starting")
                     else:
                         logger.warning("Agent is already running")
                         
@@ -207,11 +216,21 @@ async def websocket_endpoint(websocket: WebSocket):
                         orchestrator.shutdown_event.set()
                         if orchestrator_thread:
                             orchestrator_thread.join(timeout=5)
+                        # Set before the check so run_orchestrator announces a stop that lands after it
+                        orchestrator_stopping = True
                         orchestrator_running = False
-                        await manager.broadcast({
-                            "type": "agent_stopped"
-                        })
-                        logger.info("Agent stopped successfully")
+                        if orchestrator_thread and orchestrator_thread.is_alive():
+                            # Still finishing background work; run_orchestrator announces the stop
+                            await manager.broadcast({
+                                "type": "agent_stopping"
+                            })
+                            logger.info("Agent stopping")
+                        else:
+                            orchestrator_stopping = False
+                            await manager.broadcast({
+                                "type": "agent_stopped"
+                            })
+                            logger.info("Agent stopped successfully")
                     else:
                         logger.warning("Agent is not running")
                     
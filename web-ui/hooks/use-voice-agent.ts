@@ -90,6 +90,7 @@ export function useVoiceAgent() {
       case "speaking":
         setState((prev) => ({ ...prev, status: "speaking" }));
         break;
+      case "partial_transcript":
       case "transcript":
         setState((prev) => ({ ...prev, transcript: data.text }));
         break;
@@ -115,6 +116,11 @@ export function useVoiceAgent() {
         setState((prev) => ({ ...prev, agentRunning: false, status: "idle" }));
         console.log("Agent stopped");
         break;
+      case "agent_stopping":
+        // The previous agent is still finishing background work; a start is refused until agent_stopped
+        setState((prev) => ({ ...prev, agentRunning: false, status: "idle" }));
+        console.log("Agent stopping");
+        break;
     }
   };
 